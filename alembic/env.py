@@ -0,0 +1,50 @@
+"""Environnement Alembic : connexion et métadonnées de l'application."""
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+from app.core.config import settings
+from app.core.database import Base
+import app.models  # noqa: F401  (enregistre les tables dans Base.metadata)
+
+
+config = context.config
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Générer le SQL des migrations sans connexion (alembic upgrade --sql)."""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"}
+    )
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Appliquer les migrations sur la base configurée."""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool
+    )
+    
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
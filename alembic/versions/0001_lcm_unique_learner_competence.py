@@ -0,0 +1,61 @@
+"""Index unique (learner_id, competence_id) sur learner_competency_mastery
+
+Cible de l'upsert de _get_or_create_masteries (ON CONFLICT). Les doublons
+éventuels sont supprimés avant la création de l'index : pour chaque couple,
+la maîtrise pratiquée le plus récemment est conservée.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    """Table présente dans la base (toujours vrai en mode --sql, sans connexion)."""
+    if context.is_offline_mode():
+        return True
+    return op.get_bind().scalar(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+
+
+def upgrade() -> None:
+    # Base neuve : la table sera créée, avec l'index, par create_all
+    if not _table_exists("learner_competency_mastery"):
+        return
+    
+    op.execute("""
+        DELETE FROM learner_competency_mastery lcm
+        USING (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY learner_id, competence_id
+                ORDER BY last_practice_date DESC NULLS LAST, id DESC
+            ) AS rang
+            FROM learner_competency_mastery
+        ) doublons
+        WHERE lcm.id = doublons.id AND doublons.rang > 1
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ix_lcm_learner_competence
+        ON learner_competency_mastery (learner_id, competence_id)
+    """)
+    # Redondant avec l'index de la clé primaire
+    op.execute("DROP INDEX IF EXISTS ix_learner_competency_mastery_id")
+
+
+def downgrade() -> None:
+    if not _table_exists("learner_competency_mastery"):
+        return
+    
+    op.execute("DROP INDEX IF EXISTS ix_lcm_learner_competence")
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_learner_competency_mastery_id
+        ON learner_competency_mastery (id)
+    """)
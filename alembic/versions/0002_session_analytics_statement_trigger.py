@@ -0,0 +1,155 @@
+"""Table session_analytics et triggers au niveau instruction
+
+Crée session_analytics si besoin, installe les triggers FOR EACH STATEMENT
+(tables de transition) qui la tiennent à jour et initialise les compteurs
+depuis interaction_logs.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_COLUMNS = (
+    "session_id, total_interactions, sum_latency, count_latency, "
+    "pertinent_count, evaluated_count, category_counts"
+)
+
+# Agrégation par session : {source} table lue, {sign} 1 ou -1 (suppression)
+_AGGREGATE = """
+SELECT
+    session_id,
+    ({sign} * SUM(n))::INTEGER AS total_interactions,
+    ({sign} * SUM(sum_latency))::BIGINT AS sum_latency,
+    ({sign} * SUM(count_latency))::INTEGER AS count_latency,
+    ({sign} * SUM(pertinent))::INTEGER AS pertinent_count,
+    ({sign} * SUM(evaluated))::INTEGER AS evaluated_count,
+    jsonb_object_agg(category, {sign} * n) AS category_counts
+FROM (
+    SELECT
+        session_id,
+        COALESCE(action_category, 'non_categorise') AS category,
+        COUNT(*) AS n,
+        COALESCE(SUM(NULLIF(response_latency, 0)), 0) AS sum_latency,
+        COUNT(NULLIF(response_latency, 0)) AS count_latency,
+        COUNT(*) FILTER (WHERE est_pertinent) AS pertinent,
+        COUNT(est_pertinent) AS evaluated
+    FROM {source}
+    WHERE session_id IS NOT NULL
+    GROUP BY session_id, COALESCE(action_category, 'non_categorise')
+) AS per_category
+GROUP BY session_id
+"""
+
+_APPLY_DELTA = """
+INSERT INTO session_analytics AS sa ({columns})
+{aggregate}
+ON CONFLICT (session_id) DO UPDATE SET
+    total_interactions = sa.total_interactions + EXCLUDED.total_interactions,
+    sum_latency = sa.sum_latency + EXCLUDED.sum_latency,
+    count_latency = sa.count_latency + EXCLUDED.count_latency,
+    pertinent_count = sa.pertinent_count + EXCLUDED.pertinent_count,
+    evaluated_count = sa.evaluated_count + EXCLUDED.evaluated_count,
+    category_counts = session_analytics_add_counts(sa.category_counts, EXCLUDED.category_counts);
+"""
+
+
+def _apply_delta(source: str, sign: int) -> str:
+    """Requête d'application du delta lu dans une table de transition."""
+    return _APPLY_DELTA.format(
+        columns=_COLUMNS, aggregate=_AGGREGATE.format(source=source, sign=sign)
+    )
+
+
+_ADD_COUNTS_FUNCTION = """
+CREATE OR REPLACE FUNCTION session_analytics_add_counts(a JSONB, b JSONB)
+RETURNS JSONB AS $$
+    SELECT COALESCE(
+        jsonb_object_agg(key, COALESCE((a ->> key)::INTEGER, 0) + COALESCE((b ->> key)::INTEGER, 0)),
+        '{}'::JSONB
+    )
+    FROM (SELECT jsonb_object_keys(a) UNION SELECT jsonb_object_keys(b)) AS keys(key);
+$$ LANGUAGE sql IMMUTABLE
+"""
+
+_TRIGGER_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION interaction_logs_analytics_trg() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+{_apply_delta("old_rows", -1)}
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+{_apply_delta("new_rows", 1)}
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# (suffixe, événement, tables de transition) : un seul événement par trigger
+_TRIGGERS = (
+    ("ins", "INSERT", "NEW TABLE AS new_rows"),
+    ("upd", "UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("del", "DELETE", "OLD TABLE AS old_rows"),
+)
+
+
+def _table_exists(name: str) -> bool:
+    """Table présente dans la base (toujours vrai en mode --sql, sans connexion)."""
+    if context.is_offline_mode():
+        return True
+    return op.get_bind().scalar(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+
+
+def upgrade() -> None:
+    # Base neuve : table et triggers seront créés par create_all
+    if not _table_exists("interaction_logs"):
+        return
+    
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS session_analytics (
+            session_id UUID PRIMARY KEY REFERENCES simulation_sessions (id),
+            total_interactions INTEGER NOT NULL,
+            sum_latency BIGINT NOT NULL,
+            count_latency INTEGER NOT NULL,
+            pertinent_count INTEGER NOT NULL,
+            evaluated_count INTEGER NOT NULL,
+            category_counts JSONB NOT NULL
+        )
+    """)
+    
+    # Aucune écriture concurrente entre l'installation des triggers et le calcul initial
+    op.execute("LOCK TABLE interaction_logs IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(_ADD_COUNTS_FUNCTION)
+    op.execute(_TRIGGER_FUNCTION)
+    for suffix, event, transition in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_interaction_logs_analytics_{suffix} ON interaction_logs")
+        op.execute(
+            f"CREATE TRIGGER trg_interaction_logs_analytics_{suffix} "
+            f"AFTER {event} ON interaction_logs "
+            f"REFERENCING {transition} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION interaction_logs_analytics_trg()"
+        )
+    
+    op.execute("DELETE FROM session_analytics")
+    op.execute(f"INSERT INTO session_analytics ({_COLUMNS}) " + _AGGREGATE.format(source="interaction_logs", sign=1))
+
+
+def downgrade() -> None:
+    if not _table_exists("interaction_logs"):
+        return
+    
+    for suffix, _, _ in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_interaction_logs_analytics_{suffix} ON interaction_logs")
+    op.execute("DROP FUNCTION IF EXISTS interaction_logs_analytics_trg()")
+    op.execute("DROP FUNCTION IF EXISTS session_analytics_add_counts(JSONB, JSONB)")
+    op.execute("DROP TABLE IF EXISTS session_analytics")
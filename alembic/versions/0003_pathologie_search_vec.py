@@ -0,0 +1,50 @@
+"""Colonne générée search_vec et index GIN sur pathologies
+
+Vecteur plein texte (nom + description) utilisé par la recherche de
+pathologies ; create_all n'ajoute pas la colonne à une table existante.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    """Table présente dans la base (toujours vrai en mode --sql, sans connexion)."""
+    if context.is_offline_mode():
+        return True
+    return op.get_bind().scalar(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+
+
+def upgrade() -> None:
+    # Base neuve : la table sera créée, avec la colonne, par create_all
+    if not _table_exists("pathologies"):
+        return
+    
+    op.execute("""
+        ALTER TABLE pathologies ADD COLUMN IF NOT EXISTS search_vec TSVECTOR
+        GENERATED ALWAYS AS (
+            to_tsvector('french', coalesce(nom_fr, '') || ' ' || coalesce(description, ''))
+        ) STORED
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_pathologie_search_vec
+        ON pathologies USING gin (search_vec)
+    """)
+
+
+def downgrade() -> None:
+    if not _table_exists("pathologies"):
+        return
+    
+    op.execute("DROP INDEX IF EXISTS ix_pathologie_search_vec")
+    op.execute("ALTER TABLE pathologies DROP COLUMN IF EXISTS search_vec")
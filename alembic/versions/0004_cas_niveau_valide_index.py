@@ -0,0 +1,48 @@
+"""Index partiel ix_cas_niveau_valide sur cas_cliniques_enrichis
+
+Recherche des cas validés par niveau de difficulté (recommandation) ;
+index déclaré dans le modèle, que create_all n'ajoute pas à une table
+existante.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    """Table présente dans la base (toujours vrai en mode --sql, sans connexion)."""
+    if context.is_offline_mode():
+        return True
+    return op.get_bind().scalar(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+
+
+def upgrade() -> None:
+    # Base neuve : l'index sera créé avec la table par create_all
+    if not _table_exists("cas_cliniques_enrichis"):
+        return
+    
+    # CONCURRENTLY : construction sans bloquer les écritures, hors transaction
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cas_niveau_valide
+            ON cas_cliniques_enrichis (niveau_difficulte, valide_expert)
+            WHERE valide_expert = true
+        """)
+
+
+def downgrade() -> None:
+    if not _table_exists("cas_cliniques_enrichis"):
+        return
+    
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_cas_niveau_valide")
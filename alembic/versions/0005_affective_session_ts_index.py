@@ -0,0 +1,47 @@
+"""Index ix_affective_session_ts sur learner_affective_states
+
+Dernier état affectif d'une session (ORDER BY timestamp DESC LIMIT 1) ;
+index déclaré dans le modèle, que create_all n'ajoute pas à une table
+existante.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    """Table présente dans la base (toujours vrai en mode --sql, sans connexion)."""
+    if context.is_offline_mode():
+        return True
+    return op.get_bind().scalar(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+
+
+def upgrade() -> None:
+    # Base neuve : l'index sera créé avec la table par create_all
+    if not _table_exists("learner_affective_states"):
+        return
+    
+    # CONCURRENTLY : construction sans bloquer les écritures, hors transaction
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_affective_session_ts
+            ON learner_affective_states (session_id, timestamp DESC)
+        """)
+
+
+def downgrade() -> None:
+    if not _table_exists("learner_affective_states"):
+        return
+    
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_affective_session_ts")
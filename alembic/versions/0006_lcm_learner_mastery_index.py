@@ -0,0 +1,47 @@
+"""Index ix_lcm_learner_mastery sur learner_competency_mastery
+
+Maîtrise moyenne et compétences les plus faibles d'un apprenant (index
+couvrant) ; index déclaré dans le modèle, que create_all n'ajoute pas à
+une table existante.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    """Table présente dans la base (toujours vrai en mode --sql, sans connexion)."""
+    if context.is_offline_mode():
+        return True
+    return op.get_bind().scalar(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+
+
+def upgrade() -> None:
+    # Base neuve : l'index sera créé avec la table par create_all
+    if not _table_exists("learner_competency_mastery"):
+        return
+    
+    # CONCURRENTLY : construction sans bloquer les écritures, hors transaction
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_lcm_learner_mastery
+            ON learner_competency_mastery (learner_id, mastery_level)
+        """)
+
+
+def downgrade() -> None:
+    if not _table_exists("learner_competency_mastery"):
+        return
+    
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_lcm_learner_mastery")
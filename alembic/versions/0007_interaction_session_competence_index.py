@@ -0,0 +1,48 @@
+"""Index partiel ix_interaction_session_competence sur interaction_logs
+
+Interactions porteuses d'une compétence évaluée (extraction SQL des scores
+par compétence) ; le prédicat reprend l'expression de la requête de
+extract_competences_from_actions pour que le planificateur utilise l'index.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    """Table présente dans la base (toujours vrai en mode --sql, sans connexion)."""
+    if context.is_offline_mode():
+        return True
+    return op.get_bind().scalar(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+
+
+def upgrade() -> None:
+    # Base neuve : l'index sera créé avec la table par create_all
+    if not _table_exists("interaction_logs"):
+        return
+    
+    # CONCURRENTLY : construction sans bloquer les écritures, hors transaction
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interaction_session_competence
+            ON interaction_logs (session_id)
+            WHERE CAST((action_content ->> 'competence_id') AS VARCHAR) IS NOT NULL
+        """)
+
+
+def downgrade() -> None:
+    if not _table_exists("interaction_logs"):
+        return
+    
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_interaction_session_competence")
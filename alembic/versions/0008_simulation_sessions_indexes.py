@@ -0,0 +1,53 @@
+"""Index ix_sessions_learner_statut_time et ix_sessions_learner_score_termine
+
+Sessions d'un apprenant par statut dans l'ordre chronologique, et sessions
+terminées triées par score (index partiel) ; index déclarés dans le modèle,
+que create_all n'ajoute pas à une table existante.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    """Table présente dans la base (toujours vrai en mode --sql, sans connexion)."""
+    if context.is_offline_mode():
+        return True
+    return op.get_bind().scalar(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+
+
+def upgrade() -> None:
+    # Base neuve : les index seront créés avec la table par create_all
+    if not _table_exists("simulation_sessions"):
+        return
+    
+    # CONCURRENTLY : construction sans bloquer les écritures, hors transaction
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sessions_learner_statut_time
+            ON simulation_sessions (learner_id, statut, start_time)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sessions_learner_score_termine
+            ON simulation_sessions (learner_id, score_final)
+            WHERE statut = 'termine'
+        """)
+
+
+def downgrade() -> None:
+    if not _table_exists("simulation_sessions"):
+        return
+    
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_sessions_learner_statut_time")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_sessions_learner_score_termine")
@@ -0,0 +1,49 @@
+"""Extension pg_trgm et index ix_pathologie_nom_trgm sur pathologies
+
+Recherche de pathologies par sous-chaîne (ILIKE '%terme%') : index GIN
+trigrammes ; l'opclass gin_trgm_ops est fournie par l'extension pg_trgm,
+installée par create_all seulement à la création de la table.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    """Table présente dans la base (toujours vrai en mode --sql, sans connexion)."""
+    if context.is_offline_mode():
+        return True
+    return op.get_bind().scalar(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+
+
+def upgrade() -> None:
+    # Base neuve : l'index sera créé avec la table par create_all
+    if not _table_exists("pathologies"):
+        return
+    
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    
+    # CONCURRENTLY : construction sans bloquer les écritures, hors transaction
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pathologie_nom_trgm
+            ON pathologies USING gin (nom_fr gin_trgm_ops)
+        """)
+
+
+def downgrade() -> None:
+    if not _table_exists("pathologies"):
+        return
+    
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_pathologie_nom_trgm")
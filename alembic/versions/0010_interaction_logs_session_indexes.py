@@ -0,0 +1,57 @@
+"""Index (session_id, ..., timestamp) sur interaction_logs
+
+Interactions d'une session par ordre chronologique, filtrées ou non par
+catégorie ou par type d'action ; index déclarés dans le modèle, que
+create_all n'ajoute pas à une table existante.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    """Table présente dans la base (toujours vrai en mode --sql, sans connexion)."""
+    if context.is_offline_mode():
+        return True
+    return op.get_bind().scalar(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+
+
+def upgrade() -> None:
+    # Base neuve : les index seront créés avec la table par create_all
+    if not _table_exists("interaction_logs"):
+        return
+    
+    # CONCURRENTLY : construction sans bloquer les écritures, hors transaction
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interaction_session_ts
+            ON interaction_logs (session_id, timestamp)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interaction_session_cat_ts
+            ON interaction_logs (session_id, action_category, timestamp)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interaction_session_type_ts
+            ON interaction_logs (session_id, action_type, timestamp)
+        """)
+
+
+def downgrade() -> None:
+    if not _table_exists("interaction_logs"):
+        return
+    
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_interaction_session_ts")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_interaction_session_cat_ts")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_interaction_session_type_ts")
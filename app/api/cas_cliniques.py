@@ -16,7 +16,7 @@ from app.services.cas_clinique_service import (
     get_case_by_code,
     get_cases_by_pathologie,
     get_cases_by_competences,
-    increment_case_usage,
+    get_and_increment_case_usage,
     update_case_statistics,
     get_recommended_cases_for_learner
 )
@@ -154,16 +154,14 @@ def increment_usage(
     db: Session = Depends(get_db)
 ):
     """Incrémenter le compteur d'utilisation d'un cas."""
-    case = get_case_by_id(db, cas_id)
-    if not case:
+    nb_utilisations = get_and_increment_case_usage(db, cas_id)
+    if nb_utilisations is None:
         raise HTTPException(status_code=404, detail="Cas clinique non trouvé")
     
-    increment_case_usage(db, cas_id)
-    
     return {
         "cas_id": cas_id,
         "message": "Compteur d'utilisation incrémenté",
-        "nb_utilisations": (case.nb_utilisations or 0) + 1
+        "nb_utilisations": nb_utilisations
     }
 
 
@@ -15,6 +15,7 @@ from app.schemas.interaction_log import (
 )
 from app.services.interaction_log_service import (
     create_interaction,
+    enqueue_interaction,
     create_interactions_batch,
     get_interactions_by_session,
     get_interactions_by_category,
@@ -48,6 +49,30 @@ def create_interaction_log(
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'enregistrement: {str(e)}")
 
 
+@router.post("/async", status_code=202)
+def enqueue_interaction_log(
+    data: InteractionLogCreate,
+    db: Session = Depends(get_db)
+):
+    """Enregistrer une interaction en différé (écriture groupée en tâche de fond)."""
+    try:
+        enqueue_interaction(
+            db,
+            data.session_id,
+            data.action_type,
+            data.action_category,
+            data.action_content,
+            data.response_latency
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return {
+        "session_id": str(data.session_id),
+        "message": "Interaction mise en file d'attente"
+    }
+
+
 @router.post("/batch", response_model=list[InteractionLogResponse], status_code=201)
 def create_interactions_batch_endpoint(
     data: InteractionLogBatchCreate,
@@ -30,7 +30,7 @@ def infer_from_interaction(
     db: Session = Depends(get_db)
 ):
     """Inférer la maîtrise depuis une interaction unique (BKT)."""
-    learner = db.query(Learner).filter(Learner.id == learner_id).first()
+    learner = db.get(Learner, learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
@@ -101,7 +101,7 @@ def get_summary(
     db: Session = Depends(get_db)
 ):
     """Obtenir un résumé complet des connaissances."""
-    learner = db.query(Learner).filter(Learner.id == learner_id).first()
+    learner = db.get(Learner, learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
@@ -112,14 +112,15 @@ def get_summary(
 def get_weak(
     learner_id: int,
     threshold: float = Query(0.5, ge=0.0, le=1.0),
+    limit: Optional[int] = Query(None, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
     """Identifier les compétences faibles."""
-    learner = db.query(Learner).filter(Learner.id == learner_id).first()
+    learner = db.get(Learner, learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
-    weak = identify_weak_competences(db, learner_id, threshold)
+    weak = identify_weak_competences(db, learner_id, threshold, limit)
     
     return {
         "learner_id": learner_id,
@@ -23,7 +23,7 @@ def create_or_update_affective(
     db: Session = Depends(get_db)
 ):
     """Créer ou mettre à jour l'état affectif d'un apprenant."""
-    learner = db.query(Learner).get(data.learner_id)
+    learner = db.get(Learner, data.learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
@@ -56,7 +56,7 @@ def get_affective_state(
     db: Session = Depends(get_db)
 ):
     """Récupérer l'état affectif d'un apprenant."""
-    learner = db.query(Learner).get(learner_id)
+    learner = db.get(Learner, learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
@@ -77,7 +77,7 @@ def update_from_score(
     db: Session = Depends(get_db)
 ):
     """Mettre à jour l'état affectif basé sur un score de performance."""
-    learner = db.query(Learner).get(learner_id)
+    learner = db.get(Learner, learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
@@ -129,7 +129,7 @@ def get_affective_profile_endpoint(
     db: Session = Depends(get_db)
 ):
     """Obtenir un profil affectif détaillé."""
-    learner = db.query(Learner).get(learner_id)
+    learner = db.get(Learner, learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
@@ -156,7 +156,7 @@ def get_feedback_type_endpoint(
     db: Session = Depends(get_db)
 ):
     """Obtenir le type de feedback recommandé."""
-    learner = db.query(Learner).get(learner_id)
+    learner = db.get(Learner, learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
@@ -130,6 +130,7 @@ def get_knowledge_summary(
 def get_weak_competences(
     learner_id: int,
     threshold: float = Query(0.5, ge=0.0, le=1.0),
+    limit: Optional[int] = Query(None, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
     """Identifier les compétences faibles."""
@@ -137,7 +138,7 @@ def get_weak_competences(
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
-    weak_comps = identify_weak_competences(db, learner_id, threshold)
+    weak_comps = identify_weak_competences(db, learner_id, threshold, limit)
     
     return {
         "learner_id": learner_id,
@@ -28,12 +28,12 @@ def set_knowledge(
 ):
     """Créer ou mettre à jour le niveau de maîtrise d'un concept pour un apprenant."""
     # Vérifier que l'apprenant existe
-    learner = db.query(Learner).get(data.learner_id)
+    learner = db.get(Learner, data.learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
     # Vérifier que le concept existe
-    concept = db.query(Concept).get(data.concept_id)
+    concept = db.get(Concept, data.concept_id)
     if not concept:
         raise HTTPException(status_code=404, detail="Concept non trouvé")
     
@@ -64,7 +64,7 @@ def get_learner_knowledge(
     db: Session = Depends(get_db)
 ):
     """Récupérer le modèle de connaissances d'un apprenant."""
-    learner = db.query(Learner).get(learner_id)
+    learner = db.get(Learner, learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
@@ -97,7 +97,7 @@ def get_knowledge_summary(
     db: Session = Depends(get_db)
 ):
     """Obtenir un résumé des connaissances d'un apprenant."""
-    learner = db.query(Learner).get(learner_id)
+    learner = db.get(Learner, learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
@@ -112,11 +112,11 @@ def update_knowledge_from_activity(
     db: Session = Depends(get_db)
 ):
     """Mettre à jour le niveau de maîtrise basé sur une activité."""
-    learner = db.query(Learner).get(learner_id)
+    learner = db.get(Learner, learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
-    concept = db.query(Concept).get(concept_id)
+    concept = db.get(Concept, concept_id)
     if not concept:
         raise HTTPException(status_code=404, detail="Concept non trouvé")
     
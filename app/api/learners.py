@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.core.deps import get_db
 from app.models.learner import Learner
 from app.schemas.learner import LearnerCreate, LearnerResponse, LearnerUpdate
+from app.services.learner_service import LearnerService
 
 router = APIRouter(prefix="/learners", tags=["Learners"])
 
@@ -29,6 +30,27 @@ def create_learner(learner: LearnerCreate, db: Session = Depends(get_db)):
     return new_learner
 
 
+@router.post("/batch", response_model=list[LearnerResponse], status_code=201)
+def create_learners_batch(learners: list[LearnerCreate], db: Session = Depends(get_db)):
+    """Créer plusieurs apprenants en une seule transaction."""
+    emails = [learner.email for learner in learners]
+    matricules = [learner.matricule for learner in learners if learner.matricule]
+    
+    # Doublons dans le lot lui-même
+    if len(set(emails)) != len(emails):
+        raise HTTPException(status_code=400, detail="Email en double dans le lot")
+    if len(set(matricules)) != len(matricules):
+        raise HTTPException(status_code=400, detail="Matricule en double dans le lot")
+    
+    # Doublons avec la base (une requête par champ)
+    if db.query(Learner.id).filter(Learner.email.in_(emails)).first():
+        raise HTTPException(status_code=400, detail="Email déjà utilisé")
+    if matricules and db.query(Learner.id).filter(Learner.matricule.in_(matricules)).first():
+        raise HTTPException(status_code=400, detail="Matricule déjà utilisé")
+    
+    return LearnerService.create_learners(db, learners)
+
+
 @router.get("/", response_model=list[LearnerResponse])
 def list_learners(
     skip: int = 0,
@@ -48,10 +48,16 @@ def list_pathologies(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=200),
     categorie: Optional[str] = None,
+    after_id: Optional[int] = Query(None, ge=0),
     db: Session = Depends(get_db)
 ):
-    """Récupérer la liste des pathologies."""
-    return get_all_pathologies(db, skip, limit, categorie)
+    """
+    Récupérer la liste des pathologies.
+    
+    Pour paginer par curseur, passer en `after_id` l'ID de la dernière
+    pathologie reçue.
+    """
+    return get_all_pathologies(db, skip, limit, categorie, after_id)
 
 
 @router.get("/{pathologie_id}", response_model=PathologieResponse)
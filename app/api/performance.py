@@ -1,6 +1,7 @@
 """Routes FastAPI pour l'analyse des performances."""
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from typing import Optional
 from app.core.deps import get_db
 from app.models.learner import Learner
 from app.services.performance_service import (
@@ -16,6 +17,7 @@ router = APIRouter(prefix="/performances", tags=["Performance Analytics"])
 @router.get("/stats/{learner_id}")
 def get_stats(
     learner_id: int,
+    include_sessions: bool = Query(True, description="Inclure le détail des sessions"),
     db: Session = Depends(get_db)
 ):
     """Obtenir les statistiques de performance d'un apprenant."""
@@ -23,7 +25,7 @@ def get_stats(
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
-    return get_learner_performance_stats(db, learner_id)
+    return get_learner_performance_stats(db, learner_id, include_sessions)
 
 
 @router.get("/by-difficulty/{learner_id}")
@@ -48,6 +50,7 @@ def get_by_difficulty(
 def get_weak_cases(
     learner_id: int,
     threshold: float = Query(60.0, ge=0.0, le=100.0),
+    limit: Optional[int] = Query(None, ge=1, le=200),
     db: Session = Depends(get_db)
 ):
     """Identifier les cas où l'apprenant a eu des difficultés."""
@@ -55,7 +58,7 @@ def get_weak_cases(
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
-    weak = identify_weak_cases(db, learner_id, threshold)
+    weak = identify_weak_cases(db, learner_id, threshold, limit)
     
     return {
         "learner_id": learner_id,
@@ -84,19 +87,21 @@ def get_trend(
     db: Session = Depends(get_db)
 ):
     """Obtenir la tendance des performances."""
-    from app.services.performance_service import compute_trend
+    from sqlalchemy import func
+    from app.services.performance_service import compute_trend, get_trend_scores
     from app.models.simulation_session import SimulationSession
     
     learner = db.query(Learner).filter(Learner.id == learner_id).first()
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
-    sessions = db.query(SimulationSession).filter(
+    nb_scores = db.query(func.count(SimulationSession.score_final)).filter(
         SimulationSession.learner_id == learner_id,
         SimulationSession.statut == "termine"
-    ).order_by(SimulationSession.start_time).all()
+    ).scalar()
     
-    scores = [s.score_final for s in sessions if s.score_final is not None]
+    # 3 premiers et 5 derniers scores : assez pour la tendance et l'historique récent
+    scores = get_trend_scores(db, learner_id, nb_scores, head=3, tail=5)
     
     if not scores:
         return {
@@ -110,7 +115,7 @@ def get_trend(
     return {
         "learner_id": learner_id,
         "trend": trend,
-        "nb_sessions": len(scores),
+        "nb_sessions": nb_scores,
         "latest_scores": scores[-5:] if len(scores) >= 5 else scores,
         "message": _get_trend_message(trend)
     }
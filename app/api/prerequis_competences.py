@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.core.deps import get_db
 from app.models.prerequis_competence import PrerequisCompetence
 from app.models.competence_clinique import CompetenceClinique
+from app.services.competence_service import clear_prerequis_map
 from app.schemas.prerequis_competence import (
     PrerequisCompetenceCreate,
     PrerequisCompetenceResponse,
@@ -51,6 +52,7 @@ def create_prerequis(
     new_prerequis = PrerequisCompetence(**prerequis.model_dump())
     db.add(new_prerequis)
     db.commit()
+    clear_prerequis_map(db)
     db.refresh(new_prerequis)
     return new_prerequis
 
@@ -147,6 +149,7 @@ def update_prerequis(
         setattr(prerequis, field, value)
     
     db.commit()
+    clear_prerequis_map(db)
     db.refresh(prerequis)
     return prerequis
 
@@ -165,5 +168,6 @@ def delete_prerequis(
     
     db.delete(prerequis)
     db.commit()
+    clear_prerequis_map(db)
     return None
 
@@ -92,14 +92,20 @@ def get_learner_sessions(
     learner_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    before_id: Optional[UUID] = None,
     db: Session = Depends(get_db)
 ):
-    """Récupérer toutes les sessions d'un apprenant."""
+    """
+    Récupérer toutes les sessions d'un apprenant.
+    
+    Pour paginer par curseur, passer en `before_id` l'ID de la dernière
+    session reçue.
+    """
     learner = db.query(Learner).filter(Learner.id == learner_id).first()
     if not learner:
         raise HTTPException(status_code=404, detail="Apprenant non trouvé")
     
-    return get_sessions_by_learner(db, learner_id, skip, limit)
+    return get_sessions_by_learner(db, learner_id, skip, limit, before_id)
 
 
 @router.get("/active/{learner_id}", response_model=SimulationSessionResponse)
@@ -7,6 +7,7 @@ engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
+    expire_on_commit=False,
     bind=engine
 )
 
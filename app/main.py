@@ -1,4 +1,5 @@
 """Point d'entrée FastAPI pour l'application STI."""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
@@ -20,15 +21,25 @@ from app.api.learner_behavior import router as behavior_router
 from app.api.learner_cognitive import router as cognitive_router
 from app.api.learner_affective import router as affective_router
 from app.api.adaptation import router as adaptation_router
+from app.services.interaction_log_service import flush_pending_interactions
 
 # Créer les tables
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Cycle de vie : écrire les interactions encore en file avant l'arrêt."""
+    yield
+    flush_pending_interactions()
+
+
 # Créer l'application FastAPI
 app = FastAPI(
     title="Module apprenant sti",
     version="1.0.0",
-    debug=True
+    debug=True,
+    lifespan=lifespan
 )
 
 # Ajouter les middlewares CORS
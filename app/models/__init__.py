@@ -7,6 +7,7 @@ from app.models.prerequis_competence import PrerequisCompetence
 from app.models.learner_competency_mastery import LearnerCompetencyMastery
 from app.models.simulation_session import SimulationSession
 from app.models.interaction_log import InteractionLog
+from app.models.session_analytics import SessionAnalytics
 from app.models.cas_clinique import CasCliniqueEnrichi
 from app.models.pathologie import Pathologie
 from app.models.symptome import Symptome
@@ -29,6 +30,7 @@ __all__ = [
     "LearnerCompetencyMastery",
     "SimulationSession",
     "InteractionLog",
+    "SessionAnalytics",
     "CasCliniqueEnrichi",
     "Pathologie",
     "Symptome",
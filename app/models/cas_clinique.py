@@ -1,5 +1,5 @@
 """Modèle SQLAlchemy pour les cas cliniques."""
-from sqlalchemy import Column, Integer, String, Text, Boolean, Date, DateTime, ForeignKey, JSON, Numeric
+from sqlalchemy import Column, Integer, String, Text, Boolean, Date, DateTime, ForeignKey, JSON, Numeric, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import ARRAY
@@ -37,6 +37,17 @@ class CasCliniqueEnrichi(Base):
     pathologies_secondaires_ids = Column(ARRAY(Integer), nullable=True)
     expert_validateur_id = Column(Integer, nullable=True)
 
+    # Index
+    __table_args__ = (
+        # Recommandation : recherche des cas validés par niveau de difficulté
+        Index(
+            "ix_cas_niveau_valide",
+            "niveau_difficulte",
+            "valide_expert",
+            postgresql_where=(valide_expert == True)
+        ),
+    )
+
     # Relations STI
     pathologie_principale = relationship(
         "Pathologie",
@@ -1,5 +1,5 @@
 """Modèle SQLAlchemy pour les logs d'interaction."""
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -21,6 +21,19 @@ class InteractionLog(Base):
     charge_cognitive_estimee = Column(Float, nullable=True)
     est_pertinent = Column(Boolean, nullable=True)
 
+    # Index (égalité sur session_id puis clé de tri timestamp)
+    __table_args__ = (
+        Index("ix_interaction_session_ts", session_id, timestamp),
+        Index("ix_interaction_session_cat_ts", session_id, action_category, timestamp),
+        Index("ix_interaction_session_type_ts", session_id, action_type, timestamp),
+        # Interactions porteuses d'une compétence évaluée (index partiel)
+        Index(
+            "ix_interaction_session_competence",
+            session_id,
+            postgresql_where=action_content["competence_id"].as_string().isnot(None)
+        ),
+    )
+
     # Relations STI
     session = relationship(
         "SimulationSession",
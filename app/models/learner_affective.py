@@ -1,5 +1,5 @@
 """Modèle SQLAlchemy pour l'état affectif."""
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -19,6 +19,12 @@ class LearnerAffectiveState(Base):
     motivation_level = Column(Float, nullable=True)
     frustration_level = Column(Float, nullable=True)
 
+    # Index
+    __table_args__ = (
+        # Dernier état affectif d'une session (ORDER BY timestamp DESC LIMIT 1)
+        Index("ix_affective_session_ts", session_id, timestamp.desc()),
+    )
+
     # Relations STI
     session = relationship(
         "SimulationSession",
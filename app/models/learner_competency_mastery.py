@@ -1,5 +1,5 @@
 """Modèle SQLAlchemy pour la maîtrise des compétences."""
-from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -9,7 +9,7 @@ class LearnerCompetencyMastery(Base):
     __tablename__ = "learner_competency_mastery"
 
     # Colonnes
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     learner_id = Column(Integer, ForeignKey("learners.id"), nullable=False)
     competence_id = Column(Integer, ForeignKey("competences_cliniques.id"), nullable=False)
     mastery_level = Column(Float, nullable=True)
@@ -19,6 +19,15 @@ class LearnerCompetencyMastery(Base):
     nb_failures = Column(Integer, nullable=True)
     streak_correct = Column(Integer, nullable=True)
 
+    # Index
+    __table_args__ = (
+        # Maîtrise moyenne et compétences les plus faibles d'un apprenant :
+        # index couvrant et ordonné (index-only scan pour AVG, ORDER BY ... LIMIT)
+        Index("ix_lcm_learner_mastery", learner_id, mastery_level),
+        # Une seule maîtrise par apprenant et compétence (cible des upserts)
+        Index("ix_lcm_learner_competence", learner_id, competence_id, unique=True),
+    )
+
     # Relations STI
     learner = relationship(
         "Learner",
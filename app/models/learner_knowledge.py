@@ -1,3 +1,3 @@
 """Wrapper de compatibilité."""
-from app.models.competence_clinique import CompetenceClinique
-Concept = CompetenceClinique
\ No newline at end of file
+from app.models.learner_competency_mastery import LearnerCompetencyMastery
+LearnerKnowledge = LearnerCompetencyMastery
@@ -1,5 +1,9 @@
 """Modèle SQLAlchemy pour les pathologies."""
-from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, JSON
+from sqlalchemy import (
+    Column, Integer, String, Text, Numeric, DateTime, JSON, Index, Computed, DDL, event
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -26,5 +30,36 @@ class Pathologie(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    # Vecteur plein texte (nom + description), calculé et stocké par PostgreSQL ;
+    # différé : utilisé dans les filtres SQL, jamais chargé avec l'objet
+    search_vec = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('french', coalesce(nom_fr, '') || ' ' || coalesce(description, ''))",
+            persisted=True
+        )
+    ))
+
+    # Index
+    __table_args__ = (
+        # Recherche par sous-chaîne (ILIKE '%terme%') : index GIN trigrammes
+        Index(
+            "ix_pathologie_nom_trgm",
+            nom_fr,
+            postgresql_using="gin",
+            postgresql_ops={"nom_fr": "gin_trgm_ops"}
+        ),
+        # Recherche plein texte (search_vec @@ tsquery) : index GIN inversé
+        Index("ix_pathologie_search_vec", search_vec, postgresql_using="gin"),
+    )
+    
     def __repr__(self):
-        return f"<Pathologie(id={self.id}, icd10={self.code_icd10}, nom={self.nom_fr})>"
\ No newline at end of file
+        return f"<Pathologie(id={self.id}, icd10={self.code_icd10}, nom={self.nom_fr})>"
+
+
+# L'opclass gin_trgm_ops est fournie par l'extension pg_trgm
+event.listen(
+    Pathologie.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
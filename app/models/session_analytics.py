@@ -0,0 +1,147 @@
+"""Modèle SQLAlchemy pour les statistiques agrégées des sessions."""
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, event, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.core.database import Base
+
+
+class SessionAnalytics(Base):
+    """Compteurs d'interactions d'une session, tenus à jour par trigger."""
+    __tablename__ = "session_analytics"
+
+    # Colonnes
+    session_id = Column(UUID(as_uuid=True), ForeignKey("simulation_sessions.id"), primary_key=True)
+    total_interactions = Column(Integer, nullable=False, default=0)
+    sum_latency = Column(BigInteger, nullable=False, default=0)
+    count_latency = Column(Integer, nullable=False, default=0)
+    pertinent_count = Column(Integer, nullable=False, default=0)
+    evaluated_count = Column(Integer, nullable=False, default=0)
+    category_counts = Column(JSONB, nullable=False, default=dict)
+
+    def __repr__(self):
+        return f"<SessionAnalytics(session={self.session_id}, total={self.total_interactions})>"
+
+
+SESSION_ANALYTICS_COLUMNS = (
+    "session_id, total_interactions, sum_latency, count_latency, "
+    "pertinent_count, evaluated_count, category_counts"
+)
+
+# Agrégation par session (mêmes règles partout : latences nulles ou à 0
+# ignorées, catégorie absente = "non_categorise"). Paramètres :
+# {source} table lue (interaction_logs ou table de transition du trigger),
+# {session_filter} condition sur les lignes, {sign} 1 ou -1 (suppression).
+SESSION_ANALYTICS_AGGREGATE = """
+SELECT
+    session_id,
+    ({sign} * SUM(n))::INTEGER AS total_interactions,
+    ({sign} * SUM(sum_latency))::BIGINT AS sum_latency,
+    ({sign} * SUM(count_latency))::INTEGER AS count_latency,
+    ({sign} * SUM(pertinent))::INTEGER AS pertinent_count,
+    ({sign} * SUM(evaluated))::INTEGER AS evaluated_count,
+    jsonb_object_agg(category, {sign} * n) AS category_counts
+FROM (
+    SELECT
+        session_id,
+        COALESCE(action_category, 'non_categorise') AS category,
+        COUNT(*) AS n,
+        COALESCE(SUM(NULLIF(response_latency, 0)), 0) AS sum_latency,
+        COUNT(NULLIF(response_latency, 0)) AS count_latency,
+        COUNT(*) FILTER (WHERE est_pertinent) AS pertinent,
+        COUNT(est_pertinent) AS evaluated
+    FROM {source}
+    WHERE {session_filter}
+    GROUP BY session_id, COALESCE(action_category, 'non_categorise')
+) AS per_category
+GROUP BY session_id
+"""
+
+# Application d'un delta agrégé (une ligne par session touchée)
+_APPLY_DELTA_SQL = f"""
+INSERT INTO session_analytics AS sa ({SESSION_ANALYTICS_COLUMNS})
+{{aggregate}}
+ON CONFLICT (session_id) DO UPDATE SET
+    total_interactions = sa.total_interactions + EXCLUDED.total_interactions,
+    sum_latency = sa.sum_latency + EXCLUDED.sum_latency,
+    count_latency = sa.count_latency + EXCLUDED.count_latency,
+    pertinent_count = sa.pertinent_count + EXCLUDED.pertinent_count,
+    evaluated_count = sa.evaluated_count + EXCLUDED.evaluated_count,
+    category_counts = session_analytics_add_counts(sa.category_counts, EXCLUDED.category_counts);
+"""
+
+
+def _apply_delta(source: str, sign: int) -> str:
+    """Requête d'application du delta lu dans une table de transition."""
+    return _APPLY_DELTA_SQL.format(aggregate=SESSION_ANALYTICS_AGGREGATE.format(
+        source=source, session_filter="session_id IS NOT NULL", sign=sign
+    ))
+
+
+# Trigger au niveau instruction : un INSERT multi-lignes (ou un UPDATE /
+# DELETE) met à jour chaque session touchée une seule fois, à partir des
+# tables de transition. PostgreSQL n'accepte qu'un événement par trigger
+# à tables de transition, d'où trois triggers pour une même fonction.
+_INSTALL_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION session_analytics_add_counts(a JSONB, b JSONB)
+RETURNS JSONB AS $$
+    SELECT COALESCE(
+        jsonb_object_agg(key, COALESCE((a ->> key)::INTEGER, 0) + COALESCE((b ->> key)::INTEGER, 0)),
+        '{{}}'::JSONB
+    )
+    FROM (SELECT jsonb_object_keys(a) UNION SELECT jsonb_object_keys(b)) AS keys(key);
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION interaction_logs_analytics_trg() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+{_apply_delta("old_rows", -1)}
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+{_apply_delta("new_rows", 1)}
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_interaction_logs_analytics_ins ON interaction_logs;
+CREATE TRIGGER trg_interaction_logs_analytics_ins
+AFTER INSERT ON interaction_logs
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION interaction_logs_analytics_trg();
+
+DROP TRIGGER IF EXISTS trg_interaction_logs_analytics_upd ON interaction_logs;
+CREATE TRIGGER trg_interaction_logs_analytics_upd
+AFTER UPDATE ON interaction_logs
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION interaction_logs_analytics_trg();
+
+DROP TRIGGER IF EXISTS trg_interaction_logs_analytics_del ON interaction_logs;
+CREATE TRIGGER trg_interaction_logs_analytics_del
+AFTER DELETE ON interaction_logs
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION interaction_logs_analytics_trg();
+"""
+
+# Initialisation des compteurs depuis les interactions existantes
+_BACKFILL_SQL = (
+    f"INSERT INTO session_analytics ({SESSION_ANALYTICS_COLUMNS}) "
+    + SESSION_ANALYTICS_AGGREGATE.format(
+        source="interaction_logs", session_filter="session_id IS NOT NULL", sign=1
+    )
+)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_session_analytics_trigger(target, connection, tables=(), **kw):
+    """
+    Installer le trigger et initialiser les compteurs à la création de la table.
+
+    Écouteur au niveau des métadonnées : interaction_logs existe forcément
+    lorsque le trigger est créé.
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    if SessionAnalytics.__table__ not in tables:
+        return
+
+    connection.execute(text(_INSTALL_TRIGGER_SQL))
+    connection.execute(text(_BACKFILL_SQL))
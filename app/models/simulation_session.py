@@ -1,5 +1,5 @@
 """Modèle SQLAlchemy pour les sessions de simulation."""
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -25,6 +25,19 @@ class SimulationSession(Base):
     current_stage = Column(String(50), nullable=True)
     context_state = Column(JSON, nullable=True)
 
+    # Index
+    __table_args__ = (
+        # Sessions d'un apprenant par statut, dans l'ordre chronologique
+        Index("ix_sessions_learner_statut_time", learner_id, statut, start_time),
+        # Sessions terminées d'un apprenant triées par score (cas difficiles)
+        Index(
+            "ix_sessions_learner_score_termine",
+            learner_id,
+            score_final,
+            postgresql_where=(statut == "termine")
+        ),
+    )
+
     # Relations STI
     learner = relationship(
         "Learner",
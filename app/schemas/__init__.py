@@ -121,6 +121,9 @@ from app.schemas.concept import (
     ConceptResponse
 )
 
+# Validation par lot
+from app.schemas.bulk import validate_bulk
+
 __all__ = [
     # Apprenant
     "LearnerBase",
@@ -203,4 +206,7 @@ __all__ = [
     "ConceptCreate",
     "ConceptUpdate",
     "ConceptResponse",
+    
+    # Validation par lot
+    "validate_bulk",
 ]
\ No newline at end of file
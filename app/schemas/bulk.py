@@ -0,0 +1,33 @@
+"""Validation par lot des schémas Pydantic."""
+from functools import lru_cache
+from typing import Any, Iterable, List, Type, TypeVar
+from pydantic import BaseModel, TypeAdapter
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model_cls: Type[BaseModel]) -> TypeAdapter:
+    """Adaptateur list[model_cls], construit une seule fois par schéma."""
+    return TypeAdapter(List[model_cls])
+
+
+def validate_bulk(model_cls: Type[ModelT], records: Iterable[Any]) -> List[ModelT]:
+    """
+    Valider un lot d'enregistrements en un seul appel au validateur.
+    
+    La boucle de validation s'exécute dans pydantic-core plutôt qu'en
+    appelant le constructeur du schéma pour chaque enregistrement.
+    
+    Args:
+        model_cls: Schéma Pydantic des enregistrements
+        records: Enregistrements (dictionnaires ou objets)
+    
+    Returns:
+        Liste des instances validées
+    
+    Raises:
+        ValidationError: Si un enregistrement est invalide (erreurs indexées
+            par position dans le lot)
+    """
+    return _list_adapter(model_cls).validate_python(records)
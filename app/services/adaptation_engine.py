@@ -1,4 +1,5 @@
 """Moteur d'adaptation intelligente - Orchestration complète."""
+import logging
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 from typing import List, Dict, Any
@@ -9,7 +10,7 @@ from app.models.learner_affective import LearnerAffectiveState
 from app.models.learner_behavior import LearnerBehavior
 from app.models.cas_clinique import CasCliniqueEnrichi
 from app.services.knowledge_inference_service import (
-    infer_knowledge_from_interaction,
+    infer_knowledge_from_scores,
     extract_competences_from_actions
 )
 from app.services.affective_service import (
@@ -19,7 +20,12 @@ from app.services.affective_service import (
     get_affective_label
 )
 from app.services.simulation_session_service import complete_session
-from app.services.interaction_log_service import create_interactions_batch
+from app.services.interaction_log_service import (
+    create_interactions_batch,
+    wait_for_pending_interactions
+)
+
+logger = logging.getLogger(__name__)
 
 
 def process_simulation_completion(
@@ -51,29 +57,44 @@ def process_simulation_completion(
         Résultats complets de l'adaptation
     """
     # Récupérer la session
-    session = db.query(SimulationSession).filter(SimulationSession.id == session_id).first()
+    session = db.get(SimulationSession, session_id)
     if not session:
         raise ValueError(f"Session {session_id} non trouvée")
     
     learner_id = session.learner_id
     
+    # Interactions envoyées en différé (/interaction-logs/async) encore en
+    # file : les écrire avant d'en extraire les scores
+    if not wait_for_pending_interactions():
+        logger.warning("Interactions en file non écrites avant le calcul du score (session %s)", session_id)
+    
     # 1️⃣ Enregistrer les actions (batch)
+    # Les étapes 1 à 4 forment une seule transaction : le commit est fait
+    # par complete_session
     if actions:
-        create_interactions_batch(db, session_id, actions)
+        create_interactions_batch(db, session_id, actions, commit=False)
     
     # 2️⃣ Extraire les compétences sollicitées et leurs scores
     competence_scores = extract_competences_from_actions(db, session_id)
     
     # Mettre à jour les maîtrises (BKT)
-    updated_masteries = []
-    for comp_id, scores in competence_scores.items():
-        avg_score = sum(scores) / len(scores) if scores else 0
-        mastery = infer_knowledge_from_interaction(db, learner_id, comp_id, avg_score)
-        updated_masteries.append({
-            "competence_id": comp_id,
+    masteries = infer_knowledge_from_scores(
+        db,
+        learner_id,
+        {
+            comp_id: sum(scores) / len(scores) if scores else 0
+            for comp_id, scores in competence_scores.items()
+        },
+        commit=False
+    )
+    updated_masteries = [
+        {
+            "competence_id": mastery.competence_id,
             "mastery_level": round(mastery.mastery_level or 0, 2),
             "confidence": round(mastery.confidence or 0, 2)
-        })
+        }
+        for mastery in masteries
+    ]
     
     # 3️⃣ Calculer le score final de la session
     score_final = _calculate_session_score(
@@ -1,10 +1,16 @@
 """Service de gestion de l'état affectif de l'apprenant."""
-from typing import Tuple
+from bisect import bisect_left, bisect_right
+from itertools import product
+from typing import Dict, Tuple
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 from uuid import UUID
 from app.models.learner_affective import LearnerAffectiveState
-from app.models.simulation_session import SimulationSession
+
+# Code SQLSTATE d'une violation de clé étrangère (session inexistante)
+_FOREIGN_KEY_VIOLATION = "23503"
 
 
 def update_affective_state(
@@ -101,22 +107,26 @@ def record_affective_state(
     Returns:
         État affectif créé
     """
-    # Vérifier que la session existe
-    session = db.query(SimulationSession).filter(SimulationSession.id == session_id).first()
-    if not session:
-        raise ValueError(f"Session {session_id} non trouvée")
-    
-    affective = LearnerAffectiveState(
+    # INSERT ... RETURNING : une seule requête, sans SELECT de rafraîchissement.
+    # L'existence de la session est garantie par la clé étrangère ; le
+    # savepoint préserve le travail en cours de l'appelant en cas d'échec.
+    stmt = insert(LearnerAffectiveState).values(
         session_id=session_id,
         stress_level=stress_level,
         confidence_level=confidence_level,
         motivation_level=motivation_level,
         frustration_level=frustration_level
-    )
+    ).returning(LearnerAffectiveState)
+    
+    try:
+        with db.begin_nested():
+            affective = db.execute(stmt).scalar_one()
+    except IntegrityError as e:
+        if getattr(e.orig, "pgcode", None) == _FOREIGN_KEY_VIOLATION:
+            raise ValueError(f"Session {session_id} non trouvée") from e
+        raise
     
-    db.add(affective)
     db.commit()
-    db.refresh(affective)
     return affective
 
 
@@ -202,11 +212,21 @@ def get_feedback_type(
     Returns:
         Type de feedback: "encouragement", "aide", "challenge", "soutien"
     """
-    is_frustrated = detect_frustration(frustration)
-    is_demotivated = detect_demotivation(motivation)
-    is_confident = confidence > 0.7
-    is_stressed = stress > 0.7
-    
+    return _feedback_type_from_flags(
+        detect_frustration(frustration),
+        detect_demotivation(motivation),
+        confidence > 0.7,
+        stress > 0.7
+    )
+
+
+def _feedback_type_from_flags(
+    is_frustrated: bool,
+    is_demotivated: bool,
+    is_confident: bool,
+    is_stressed: bool
+) -> str:
+    """Déterminer le type de feedback à partir des indicateurs déjà calculés."""
     if is_frustrated:
         return "soutien"
     
@@ -222,14 +242,16 @@ def get_feedback_type(
     return "aide"
 
 
-def get_affective_recommendations(
+def _compute_affective_recommendations(
     motivation: float,
     frustration: float,
     confidence: float,
     stress: float
 ) -> list[str]:
     """
-    Générer des recommandations basées sur l'état affectif.
+    Implémentation de référence des recommandations affectives.
+    
+    Sert à construire la table précalculée `_RECS` au chargement du module.
     
     Args:
         motivation: Motivation (0-1)
@@ -268,6 +290,65 @@ def get_affective_recommendations(
     return recommendations
 
 
+# Seuils des recommandations affectives (3 zones par axe : 0, 1, 2)
+_M_TH = (0.3, 0.5)   # motivation : < 0.3 | < 0.5 | reste
+_F_TH = (0.5, 0.7)   # frustration : <= 0.5 | <= 0.7 | > 0.7
+_C_LOW = (0.3,)      # confiance : < 0.3 | reste | > 0.8
+_C_HIGH = (0.8,)
+_S_TH = (0.5, 0.7)   # stress : <= 0.5 | <= 0.7 | > 0.7
+
+# Valeur représentative de chaque zone, utilisée pour précalculer la table
+_M_REPR = (0.0, 0.4, 1.0)
+_F_REPR = (0.0, 0.6, 1.0)
+_C_REPR = (0.0, 0.5, 1.0)
+_S_REPR = (0.0, 0.6, 1.0)
+
+
+def _recs_key(
+    motivation: float,
+    frustration: float,
+    confidence: float,
+    stress: float
+) -> int:
+    """Encoder l'état affectif en masque (2 bits par axe)."""
+    m_bin = bisect_right(_M_TH, motivation)
+    f_bin = bisect_left(_F_TH, frustration)
+    c_bin = bisect_right(_C_LOW, confidence) + bisect_left(_C_HIGH, confidence)
+    s_bin = bisect_left(_S_TH, stress)
+    return m_bin | (f_bin << 2) | (c_bin << 4) | (s_bin << 6)
+
+
+# Table précalculée des 3^4 = 81 états possibles
+_RECS: Dict[int, Tuple[str, ...]] = {
+    _recs_key(m, f, c, s): tuple(_compute_affective_recommendations(m, f, c, s))
+    for m, f, c, s in product(_M_REPR, _F_REPR, _C_REPR, _S_REPR)
+}
+
+
+def get_affective_recommendations(
+    motivation: float,
+    frustration: float,
+    confidence: float,
+    stress: float
+) -> list[str]:
+    """
+    Générer des recommandations basées sur l'état affectif.
+    
+    Les recommandations sont lues dans une table précalculée indexée par
+    la zone (basse / moyenne / haute) de chaque dimension.
+    
+    Args:
+        motivation: Motivation (0-1)
+        frustration: Frustration (0-1)
+        confidence: Confiance (0-1)
+        stress: Stress (0-1)
+    
+    Returns:
+        Liste de recommandations
+    """
+    return list(_RECS[_recs_key(motivation, frustration, confidence, stress)])
+
+
 def get_affective_profile(
     motivation: float,
     frustration: float,
@@ -286,14 +367,23 @@ def get_affective_profile(
     Returns:
         Dictionnaire avec profil affectif complet
     """
+    # Indicateurs calculés une seule fois puis réutilisés
+    is_frustrated = detect_frustration(frustration)
+    is_demotivated = detect_demotivation(motivation)
+    
     return {
         "motivation": motivation,
         "frustration": frustration,
         "confidence": confidence,
         "stress": stress,
         "affective_label": get_affective_label(motivation, frustration, confidence, stress),
-        "is_frustrated": detect_frustration(frustration),
-        "is_demotivated": detect_demotivation(motivation),
-        "feedback_type": get_feedback_type(motivation, frustration, confidence, stress),
-        "recommendations": get_affective_recommendations(motivation, frustration, confidence, stress)
+        "is_frustrated": is_frustrated,
+        "is_demotivated": is_demotivated,
+        "feedback_type": _feedback_type_from_flags(
+            is_frustrated,
+            is_demotivated,
+            confidence > 0.7,
+            stress > 0.7
+        ),
+        "recommendations": list(_RECS[_recs_key(motivation, frustration, confidence, stress)])
     }
\ No newline at end of file
@@ -1,5 +1,10 @@
 """Service d'analyse du comportement de l'apprenant."""
 
+# Poids de l'engagement pré-divisés par les plafonds de normalisation
+_W_S = 0.3 / 20       # Sessions : 30%, max 20 sessions
+_W_A = 0.4 / 50       # Activités : 40%, max 50 activités
+_W_T = 0.3 / 36000    # Temps : 30%, max 10 heures
+
 
 def compute_engagement(
     sessions: int,
@@ -22,15 +27,14 @@ def compute_engagement(
     Returns:
         Score d'engagement (0.0 à 1.0)
     """
-    # Normaliser les valeurs
-    sessions_score = min(sessions / 20, 1.0)  # Max 20 sessions
-    activities_score = min(activities / 50, 1.0)  # Max 50 activités
-    time_score = min(time_spent / 36000, 1.0)  # Max 10 heures
-    
-    # Calcul pondéré
-    engagement = (sessions_score * 0.3) + (activities_score * 0.4) + (time_score * 0.3)
-    
-    return min(1.0, max(0.0, engagement))
+    # Chaque composante est plafonnée à son poids, la somme est donc <= 1.0
+    engagement = (
+        min(sessions * _W_S, 0.3)
+        + min(activities * _W_A, 0.4)
+        + min(time_spent * _W_T, 0.3)
+    )
+    
+    return max(0.0, engagement)
 
 
 def get_engagement_label(engagement_score: float) -> str:
@@ -1,6 +1,6 @@
 """Service pour les cas cliniques."""
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import func, update, case as sql_case
 from typing import List, Optional, Dict, Any
 from app.models.cas_clinique import CasCliniqueEnrichi
 from app.models.pathologie import Pathologie
@@ -24,9 +24,21 @@ def get_all_cases(
         valide_expert: Filtrer par validation expert
     
     Returns:
-        Liste des cas cliniques
+        Liste des cas cliniques (colonnes de CasCliniqueListResponse uniquement)
     """
-    query = db.query(CasCliniqueEnrichi)
+    # Ne charger que les colonnes affichées dans la liste (pas de JSON volumineux)
+    query = db.query(CasCliniqueEnrichi).options(
+        load_only(
+            CasCliniqueEnrichi.id,
+            CasCliniqueEnrichi.code_fultang,
+            CasCliniqueEnrichi.pathologie_principale_id,
+            CasCliniqueEnrichi.niveau_difficulte,
+            CasCliniqueEnrichi.duree_estimee_resolution_min,
+            CasCliniqueEnrichi.valide_expert,
+            CasCliniqueEnrichi.nb_utilisations,
+            CasCliniqueEnrichi.note_moyenne_apprenants
+        )
+    )
     
     if niveau_difficulte is not None:
         query = query.filter(CasCliniqueEnrichi.niveau_difficulte == niveau_difficulte)
@@ -132,10 +144,39 @@ def increment_case_usage(db: Session, cas_id: int) -> None:
         db: Session de base de données
         cas_id: ID du cas clinique
     """
-    case = db.query(CasCliniqueEnrichi).filter(CasCliniqueEnrichi.id == cas_id).first()
-    if case:
-        case.nb_utilisations = (case.nb_utilisations or 0) + 1
-        db.commit()
+    # Incrément atomique côté SQL (pas de lecture préalable, pas de perte de mise à jour)
+    db.execute(
+        update(CasCliniqueEnrichi)
+        .where(CasCliniqueEnrichi.id == cas_id)
+        .values(nb_utilisations=func.coalesce(CasCliniqueEnrichi.nb_utilisations, 0) + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def get_and_increment_case_usage(db: Session, cas_id: int) -> Optional[int]:
+    """
+    Incrémenter le compteur d'utilisation d'un cas et retourner sa nouvelle valeur.
+    
+    Une seule requête UPDATE ... RETURNING vérifie l'existence du cas
+    et incrémente le compteur.
+    
+    Args:
+        db: Session de base de données
+        cas_id: ID du cas clinique
+    
+    Returns:
+        Nouveau nombre d'utilisations, ou None si le cas n'existe pas
+    """
+    nb_utilisations = db.execute(
+        update(CasCliniqueEnrichi)
+        .where(CasCliniqueEnrichi.id == cas_id)
+        .values(nb_utilisations=func.coalesce(CasCliniqueEnrichi.nb_utilisations, 0) + 1)
+        .returning(CasCliniqueEnrichi.nb_utilisations)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    db.commit()
+    return nb_utilisations
 
 
 def update_case_statistics(
@@ -194,18 +235,19 @@ def get_recommended_cases_for_learner(
     Returns:
         Liste des cas recommandés avec scores de pertinence
     """
-    # Récupérer les maîtrises de l'apprenant
+    # Calculer le niveau moyen de l'apprenant (agrégation SQL)
     from app.models.learner_competency_mastery import LearnerCompetencyMastery
     
-    masteries = db.query(LearnerCompetencyMastery).filter(
+    avg_mastery = db.query(
+        func.avg(func.coalesce(LearnerCompetencyMastery.mastery_level, 0))
+    ).filter(
         LearnerCompetencyMastery.learner_id == learner_id
-    ).all()
+    ).scalar()
     
-    # Calculer le niveau moyen de l'apprenant
-    if masteries:
-        avg_mastery = sum(m.mastery_level or 0 for m in masteries) / len(masteries)
-    else:
+    if avg_mastery is None:
         avg_mastery = 0.3  # Débutant par défaut
+    else:
+        avg_mastery = float(avg_mastery)
     
     # Déterminer le niveau de difficulté adapté
     if avg_mastery < 0.3:
@@ -219,31 +261,25 @@ def get_recommended_cases_for_learner(
     else:
         target_difficulty = 5
     
-    # Récupérer les cas de ce niveau
-    cases = db.query(CasCliniqueEnrichi).filter(
+    # Score de pertinence calculé en SQL :
+    # +0.2 si peu utilisé (découverte), +0.1 si bonne note moyenne
+    score_expr = (
+        1.0
+        + sql_case((func.coalesce(CasCliniqueEnrichi.nb_utilisations, 0) < 5, 0.2), else_=0.0)
+        + sql_case((CasCliniqueEnrichi.note_moyenne_apprenants > 0.7, 0.1), else_=0.0)
+    ).label("relevance_score")
+    
+    # Top-K directement en base (index ix_cas_niveau_valide), égalités départagées au hasard
+    rows = db.query(CasCliniqueEnrichi, score_expr).filter(
         CasCliniqueEnrichi.niveau_difficulte == target_difficulty,
         CasCliniqueEnrichi.valide_expert == True
-    ).limit(limit * 2).all()  # Plus de cas pour filtrer
+    ).order_by(score_expr.desc(), func.random()).limit(limit).all()
     
-    # Scorer les cas
-    recommendations = []
-    for case in cases:
-        score = 1.0
-        
-        # Bonus si peu utilisé (découverte)
-        if (case.nb_utilisations or 0) < 5:
-            score += 0.2
-        
-        # Bonus si bonne note moyenne
-        if case.note_moyenne_apprenants and case.note_moyenne_apprenants > 0.7:
-            score += 0.1
-        
-        recommendations.append({
-            'case': case,
-            'relevance_score': score,
+    return [
+        {
+            'case': cas,
+            'relevance_score': float(score),
             'reason': f"Adapté à votre niveau (difficulté {target_difficulty})"
-        })
-    
-    # Trier par score et limiter
-    recommendations.sort(key=lambda x: x['relevance_score'], reverse=True)
-    return recommendations[:limit]
\ No newline at end of file
+        }
+        for cas, score in rows
+    ]
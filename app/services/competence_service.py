@@ -1,6 +1,7 @@
 """Service pour les compétences cliniques."""
+from collections import defaultdict
 from sqlalchemy.orm import Session
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set
 from app.models.competence_clinique import CompetenceClinique
 from app.models.prerequis_competence import PrerequisCompetence
 
@@ -42,7 +43,7 @@ def get_competence_by_id(db: Session, competence_id: int) -> Optional[Competence
     Returns:
         Compétence ou None
     """
-    return db.query(CompetenceClinique).filter(CompetenceClinique.id == competence_id).first()
+    return db.get(CompetenceClinique, competence_id)
 
 
 def get_competence_by_code(db: Session, code_competence: str) -> Optional[CompetenceClinique]:
@@ -61,9 +62,41 @@ def get_competence_by_code(db: Session, code_competence: str) -> Optional[Compet
     ).first()
 
 
+def get_prerequis_map(db: Session) -> Dict[int, List[int]]:
+    """
+    Charger le graphe des prérequis {competence_id: [prerequis_id, ...]}.
+    
+    Le graphe est chargé en une seule requête puis conservé dans `db.info`
+    pour la durée de la session (une requête HTTP).
+    
+    Args:
+        db: Session de base de données
+    
+    Returns:
+        Dictionnaire d'adjacence des prérequis
+    """
+    prereq_map = db.info.get("prereq_map")
+    if prereq_map is None:
+        prereq_map = defaultdict(list)
+        rows = db.query(
+            PrerequisCompetence.competence_id,
+            PrerequisCompetence.prerequis_id
+        ).all()
+        for competence_id, prerequis_id in rows:
+            prereq_map[competence_id].append(prerequis_id)
+        db.info["prereq_map"] = prereq_map
+    return prereq_map
+
+
+def clear_prerequis_map(db: Session) -> None:
+    """Invalider le graphe des prérequis mis en cache sur la session."""
+    db.info.pop("prereq_map", None)
+
+
 def get_prerequis_for_competence(
     db: Session,
-    competence_id: int
+    competence_id: int,
+    prereq_map: Optional[Dict[int, List[int]]] = None
 ) -> List[CompetenceClinique]:
     """
     Récupérer les prérequis d'une compétence.
@@ -71,15 +104,15 @@ def get_prerequis_for_competence(
     Args:
         db: Session de base de données
         competence_id: ID de la compétence
+        prereq_map: Graphe des prérequis préchargé (optionnel)
     
     Returns:
         Liste des compétences prérequises
     """
-    prerequis_relations = db.query(PrerequisCompetence).filter(
-        PrerequisCompetence.competence_id == competence_id
-    ).all()
+    if prereq_map is None:
+        prereq_map = get_prerequis_map(db)
     
-    prerequis_ids = [rel.prerequis_id for rel in prerequis_relations]
+    prerequis_ids = prereq_map.get(competence_id, [])
     
     if not prerequis_ids:
         return []
@@ -121,7 +154,8 @@ def check_prerequisites_met(
     db: Session,
     competence_id: int,
     learner_id: int,
-    threshold: float = 0.7
+    threshold: float = 0.7,
+    prereq_map: Optional[Dict[int, List[int]]] = None
 ) -> bool:
     """
     Vérifier si un apprenant a les prérequis pour une compétence.
@@ -131,24 +165,32 @@ def check_prerequisites_met(
         competence_id: ID de la compétence cible
         learner_id: ID de l'apprenant
         threshold: Seuil de maîtrise requis
+        prereq_map: Graphe des prérequis préchargé (optionnel)
     
     Returns:
         True si tous les prérequis sont maîtrisés
     """
     from app.models.learner_competency_mastery import LearnerCompetencyMastery
     
-    prerequis = get_prerequis_for_competence(db, competence_id)
+    if prereq_map is None:
+        prereq_map = get_prerequis_map(db)
+    
+    prerequis_ids = set(prereq_map.get(competence_id, []))
     
-    if not prerequis:
+    if not prerequis_ids:
         return True  # Pas de prérequis
     
-    for prereq in prerequis:
-        mastery = db.query(LearnerCompetencyMastery).filter(
-            LearnerCompetencyMastery.learner_id == learner_id,
-            LearnerCompetencyMastery.competence_id == prereq.id
-        ).first()
-        
-        if not mastery or (mastery.mastery_level or 0) < threshold:
+    # Une seule requête pour toutes les maîtrises des prérequis
+    masteries = dict(db.query(
+        LearnerCompetencyMastery.competence_id,
+        LearnerCompetencyMastery.mastery_level
+    ).filter(
+        LearnerCompetencyMastery.learner_id == learner_id,
+        LearnerCompetencyMastery.competence_id.in_(prerequis_ids)
+    ).all())
+    
+    for prereq_id in prerequis_ids:
+        if prereq_id not in masteries or (masteries[prereq_id] or 0) < threshold:
             return False
     
     return True
@@ -156,7 +198,8 @@ def check_prerequisites_met(
 
 def get_learning_path(
     db: Session,
-    target_competence_id: int
+    target_competence_id: int,
+    prereq_map: Optional[Dict[int, List[int]]] = None
 ) -> List[CompetenceClinique]:
     """
     Construire un chemin d'apprentissage pour atteindre une compétence.
@@ -164,12 +207,16 @@ def get_learning_path(
     Args:
         db: Session de base de données
         target_competence_id: ID de la compétence cible
+        prereq_map: Graphe des prérequis préchargé (optionnel)
     
     Returns:
         Liste ordonnée des compétences à maîtriser
     """
+    if prereq_map is None:
+        prereq_map = get_prerequis_map(db)
+    
     visited: Set[int] = set()
-    path: List[CompetenceClinique] = []
+    path_ids: List[int] = []
     
     def traverse(comp_id: int):
         if comp_id in visited:
@@ -177,17 +224,20 @@ def get_learning_path(
         
         visited.add(comp_id)
         
-        # Récupérer les prérequis
-        prerequis = get_prerequis_for_competence(db, comp_id)
-        
         # Traverser récursivement les prérequis
-        for prereq in prerequis:
-            traverse(prereq.id)
+        for prereq_id in prereq_map.get(comp_id, []):
+            traverse(prereq_id)
         
         # Ajouter la compétence courante
-        comp = get_competence_by_id(db, comp_id)
-        if comp:
-            path.append(comp)
+        path_ids.append(comp_id)
     
     traverse(target_competence_id)
-    return path
\ No newline at end of file
+    
+    # Charger toutes les compétences du chemin en une requête
+    competences = {
+        comp.id: comp
+        for comp in db.query(CompetenceClinique).filter(
+            CompetenceClinique.id.in_(path_ids)
+        ).all()
+    }
+    return [competences[comp_id] for comp_id in path_ids if comp_id in competences]
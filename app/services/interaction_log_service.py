@@ -1,10 +1,49 @@
 """Service pour les logs d'interaction."""
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from sqlalchemy import insert, update, select, text
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from uuid import UUID
+from app.core.database import SessionLocal
 from app.models.interaction_log import InteractionLog
+from app.models.session_analytics import SessionAnalytics, SESSION_ANALYTICS_AGGREGATE
 from app.models.simulation_session import SimulationSession
 
+logger = logging.getLogger(__name__)
+
+# Taille maximale d'un INSERT multi-lignes (au-delà de ~10 000 lignes,
+# PostgreSQL devient plus lent ; certains dialectes limitent aussi le
+# nombre de paramètres par requête)
+BATCH_SIZE = 1000
+
+# Écriture différée : file en mémoire vidée par un thread en tâche de fond
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL_S = 0.1
+_INTERACTION_QUEUE: "queue.Queue[Any]" = queue.Queue()
+_STOP = object()  # Sentinelle d'arrêt du thread d'écriture
+_FLUSHER_LOCK = threading.Lock()
+_flusher_thread: Optional[threading.Thread] = None
+
+# Erreurs transitoires (base redémarrée, connexion perdue) : le lot est
+# réessayé avec une attente exponentielle, sans limite tant que
+# l'application tourne, au plus SHUTDOWN_MAX_ATTEMPTS fois pendant l'arrêt
+RETRY_BACKOFF_S = 0.5
+RETRY_BACKOFF_MAX_S = 30.0
+SHUTDOWN_MAX_ATTEMPTS = 3
+_SHUTTING_DOWN = threading.Event()
+
+# Sessions dont l'existence a déjà été vérifiée (LRU borné)
+_KNOWN_SESSIONS_MAXSIZE = 4096
+_KNOWN_SESSIONS: "OrderedDict[UUID, None]" = OrderedDict()
+_KNOWN_SESSIONS_LOCK = threading.Lock()
+
 
 def create_interaction(
     db: Session,
@@ -48,39 +87,289 @@ def create_interaction(
     return log
 
 
+def _session_exists(db: Session, session_id: UUID) -> bool:
+    """Vérifier l'existence d'une session (résultat positif mis en cache)."""
+    with _KNOWN_SESSIONS_LOCK:
+        if session_id in _KNOWN_SESSIONS:
+            _KNOWN_SESSIONS.move_to_end(session_id)
+            return True
+    
+    exists = db.query(SimulationSession.id).filter(
+        SimulationSession.id == session_id
+    ).first() is not None
+    
+    if exists:
+        with _KNOWN_SESSIONS_LOCK:
+            _KNOWN_SESSIONS[session_id] = None
+            if len(_KNOWN_SESSIONS) > _KNOWN_SESSIONS_MAXSIZE:
+                _KNOWN_SESSIONS.popitem(last=False)
+    return exists
+
+
+def enqueue_interaction(
+    db: Session,
+    session_id: UUID,
+    action_type: str,
+    action_category: Optional[str] = None,
+    action_content: Optional[Dict[str, Any]] = None,
+    response_latency: Optional[int] = None
+) -> None:
+    """
+    Enregistrer une interaction de manière différée (fire-and-forget).
+    
+    L'interaction est placée dans une file en mémoire puis insérée par lots
+    (au plus FLUSH_BATCH_SIZE lignes, toutes les FLUSH_INTERVAL_S secondes)
+    par un thread en tâche de fond. L'horodatage est pris à l'appel pour
+    conserver l'ordre chronologique des actions.
+    
+    Args:
+        db: Session de base de données
+        session_id: ID de la session
+        action_type: Type d'action
+        action_category: Catégorie d'action
+        action_content: Contenu de l'action (JSON)
+        response_latency: Latence de réponse (ms)
+    """
+    if not _session_exists(db, session_id):
+        raise ValueError(f"Session {session_id} non trouvée")
+    
+    _INTERACTION_QUEUE.put({
+        "session_id": session_id,
+        "timestamp": datetime.now(timezone.utc),
+        "action_type": action_type,
+        "action_category": action_category,
+        "action_content": action_content,
+        "response_latency": response_latency
+    })
+    _ensure_flusher()
+
+
+def _ensure_flusher() -> None:
+    """Démarrer le thread d'écriture s'il n'est pas déjà actif."""
+    global _flusher_thread
+    
+    if _flusher_thread is not None and _flusher_thread.is_alive():
+        return
+    
+    with _FLUSHER_LOCK:
+        if _flusher_thread is None or not _flusher_thread.is_alive():
+            _flusher_thread = threading.Thread(
+                target=_flusher_loop,
+                name="interaction-log-flusher",
+                daemon=True
+            )
+            _flusher_thread.start()
+
+
+def _write_interactions(rows: List[Dict[str, Any]]) -> int:
+    """
+    Insérer un lot d'interactions dans sa propre transaction.
+    
+    Si une ligne est rejetée (session supprimée, valeur trop longue...), le
+    lot est coupé en deux et chaque moitié réessayée : seules les lignes en
+    erreur sont abandonnées. Les autres erreurs (connexion perdue, base
+    indisponible) sont considérées transitoires : la partie non écrite est
+    réessayée après une attente exponentielle.
+    
+    Returns:
+        Nombre d'interactions écrites
+    """
+    db = SessionLocal()
+    pending = [rows]
+    written = 0
+    attempt = 0
+    try:
+        while pending:
+            chunk = pending.pop()
+            try:
+                db.execute(insert(InteractionLog.__table__), chunk)
+                db.commit()
+            except (IntegrityError, DataError):
+                db.rollback()
+                if len(chunk) == 1:
+                    logger.exception("Interaction abandonnée (session %s)", chunk[0]["session_id"])
+                    _forget_session(chunk[0]["session_id"])
+                else:
+                    middle = len(chunk) // 2
+                    pending += [chunk[middle:], chunk[:middle]]
+                continue
+            except SQLAlchemyError:
+                db.rollback()
+                pending.append(chunk)
+                attempt += 1
+                remaining = sum(len(c) for c in pending)
+                if _SHUTTING_DOWN.is_set() and attempt >= SHUTDOWN_MAX_ATTEMPTS:
+                    logger.exception(
+                        "%d interactions abandonnées à l'arrêt après %d tentatives",
+                        remaining, attempt
+                    )
+                    return written
+                delay = min(RETRY_BACKOFF_S * 2 ** (attempt - 1), RETRY_BACKOFF_MAX_S)
+                logger.warning(
+                    "Écriture différée de %d interactions impossible, nouvelle tentative dans %.1f s",
+                    remaining, delay, exc_info=True
+                )
+                time.sleep(delay)
+                continue
+            
+            written += len(chunk)
+            attempt = 0
+        return written
+    finally:
+        db.close()
+
+
+def _forget_session(session_id: UUID) -> None:
+    """Retirer une session du cache d'existence (ex. session supprimée)."""
+    with _KNOWN_SESSIONS_LOCK:
+        _KNOWN_SESSIONS.pop(session_id, None)
+
+
+def _flusher_loop() -> None:
+    """Vider la file par lots : dès FLUSH_BATCH_SIZE lignes ou après FLUSH_INTERVAL_S."""
+    while True:
+        item = _INTERACTION_QUEUE.get()
+        if item is _STOP:
+            return
+        if isinstance(item, threading.Event):
+            item.set()
+            continue
+        rows = [item]
+        deadline = time.monotonic() + FLUSH_INTERVAL_S
+        marker = None
+        stop = False
+        
+        while len(rows) < FLUSH_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = _INTERACTION_QUEUE.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            if isinstance(item, threading.Event):
+                # Un appelant attend ce lot : l'écrire sans attendre le délai
+                marker = item
+                break
+            rows.append(item)
+        
+        _write_interactions(rows)
+        if marker is not None:
+            marker.set()
+        if stop:
+            return
+
+
+def wait_for_pending_interactions(timeout: float = 5.0) -> bool:
+    """
+    Attendre l'écriture des interactions mises en file avant l'appel.
+    
+    Un marqueur est placé dans la file : le thread d'écriture le signale
+    après avoir écrit tout ce qui le précède.
+    
+    Args:
+        timeout: Attente maximale (secondes)
+    
+    Returns:
+        True si les interactions en file ont été écrites dans le délai
+    """
+    marker = threading.Event()
+    _INTERACTION_QUEUE.put(marker)
+    _ensure_flusher()
+    return marker.wait(timeout)
+
+
+def flush_pending_interactions(timeout: float = 5.0) -> int:
+    """
+    Arrêter le thread d'écriture et écrire les interactions encore en file.
+    
+    Appelé à l'arrêt de l'application : le thread termine le lot en cours,
+    puis le reste de la file est écrit dans le thread appelant. Pendant
+    l'arrêt, une erreur transitoire est réessayée au plus
+    SHUTDOWN_MAX_ATTEMPTS fois.
+    
+    Args:
+        timeout: Attente maximale de la fin du thread (secondes)
+    
+    Returns:
+        Nombre d'interactions écrites par ce vidage
+    """
+    _SHUTTING_DOWN.set()
+    try:
+        with _FLUSHER_LOCK:
+            thread = _flusher_thread
+            if thread is not None and thread.is_alive():
+                _INTERACTION_QUEUE.put(_STOP)
+                thread.join(timeout)
+        
+        rows = []
+        markers = []
+        while True:
+            try:
+                item = _INTERACTION_QUEUE.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                markers.append(item)
+            elif item is not _STOP:
+                rows.append(item)
+        
+        written = sum(
+            _write_interactions(rows[start:start + FLUSH_BATCH_SIZE])
+            for start in range(0, len(rows), FLUSH_BATCH_SIZE)
+        )
+        for marker in markers:
+            marker.set()
+        return written
+    finally:
+        _SHUTTING_DOWN.clear()
+
+
 def create_interactions_batch(
     db: Session,
     session_id: UUID,
-    actions: List[Dict[str, Any]]
-) -> List[InteractionLog]:
+    actions: List[Dict[str, Any]],
+    commit: bool = True
+) -> List[Row]:
     """
     Enregistrer plusieurs interactions en batch.
     
+    INSERT multi-lignes avec RETURNING, par tranches de BATCH_SIZE actions,
+    dans une seule transaction : les valeurs générées (id, timestamp) sont
+    renvoyées sans SELECT supplémentaire.
+    
     Args:
         db: Session de base de données
         session_id: ID de la session
         actions: Liste des actions à enregistrer
+        commit: Valider la transaction (False pour laisser l'appelant
+            regrouper plusieurs écritures dans un seul commit)
     
     Returns:
-        Liste des logs créés
+        Liste des logs créés (lignes avec les colonnes d'InteractionLog)
     """
+    table = InteractionLog.__table__
+    stmt = insert(table).returning(*table.c, sort_by_parameter_order=True)
     logs = []
     
-    for action in actions:
-        log = InteractionLog(
-            session_id=session_id,
-            action_type=action.get('action_type'),
-            action_category=action.get('action_category'),
-            action_content=action.get('action_content'),
-            response_latency=action.get('response_latency')
-        )
-        db.add(log)
-        logs.append(log)
-    
-    db.commit()
+    for start in range(0, len(actions), BATCH_SIZE):
+        payload = [
+            {
+                "session_id": session_id,
+                "action_type": action.get('action_type'),
+                "action_category": action.get('action_category'),
+                "action_content": action.get('action_content'),
+                "response_latency": action.get('response_latency')
+            }
+            for action in actions[start:start + BATCH_SIZE]
+        ]
+        logs.extend(db.execute(stmt, payload).all())
     
-    for log in logs:
-        db.refresh(log)
+    if logs and commit:
+        db.commit()
     
     return logs
 
@@ -153,10 +442,13 @@ def mark_interaction_relevance(
     interaction_id: int,
     est_pertinent: bool,
     charge_cognitive: Optional[float] = None
-) -> Optional[InteractionLog]:
+) -> Optional[Row]:
     """
     Marquer la pertinence d'une interaction.
     
+    UPDATE ... RETURNING : une seule requête, sans SELECT préalable
+    ni rechargement après le commit.
+    
     Args:
         db: Session de base de données
         interaction_id: ID de l'interaction
@@ -164,21 +456,52 @@ def mark_interaction_relevance(
         charge_cognitive: Charge cognitive estimée
     
     Returns:
-        Log mis à jour ou None
+        Log mis à jour (ligne avec les colonnes d'InteractionLog) ou None
     """
-    log = db.query(InteractionLog).filter(InteractionLog.id == interaction_id).first()
-    if not log:
-        return None
-    
-    log.est_pertinent = est_pertinent
+    values = {"est_pertinent": est_pertinent}
     if charge_cognitive is not None:
-        log.charge_cognitive_estimee = charge_cognitive
+        values["charge_cognitive_estimee"] = charge_cognitive
+    
+    table = InteractionLog.__table__
+    log = db.execute(
+        update(table)
+        .where(table.c.id == interaction_id)
+        .values(**values)
+        .returning(*table.c)
+    ).first()
+    
+    if log is None:
+        return None
     
     db.commit()
-    db.refresh(log)
     return log
 
 
+def _aggregate_session_analytics(
+    db: Session,
+    session_id: UUID
+) -> Optional[Row]:
+    """
+    Calculer les statistiques agrégées d'une session depuis ses interactions.
+    
+    Lecture seule, utilisée lorsque la ligne de session_analytics est
+    absente (session sans interaction).
+    
+    Args:
+        db: Session de base de données
+        session_id: ID de la session
+    
+    Returns:
+        Ligne aux colonnes de session_analytics ou None si aucune interaction
+    """
+    return db.execute(
+        text(SESSION_ANALYTICS_AGGREGATE.format(
+            source="interaction_logs", session_filter="session_id = :session_id", sign=1
+        )),
+        {"session_id": session_id}
+    ).first()
+
+
 def analyze_session_interactions(
     db: Session,
     session_id: UUID
@@ -186,6 +509,10 @@ def analyze_session_interactions(
     """
     Analyser les interactions d'une session.
     
+    Les compteurs sont lus dans session_analytics (tenue à jour par trigger
+    sur interaction_logs) : une seule ligne lue, quel que soit le nombre
+    d'interactions.
+    
     Args:
         db: Session de base de données
         session_id: ID de la session
@@ -193,9 +520,15 @@ def analyze_session_interactions(
     Returns:
         Statistiques d'analyse
     """
-    interactions = get_interactions_by_session(db, session_id)
+    table = SessionAnalytics.__table__
+    stats = db.execute(
+        select(*table.c).where(table.c.session_id == session_id)
+    ).first()
+    
+    if stats is None:
+        stats = _aggregate_session_analytics(db, session_id)
     
-    if not interactions:
+    if stats is None or not stats.total_interactions:
         return {
             "total_interactions": 0,
             "average_latency": 0,
@@ -203,23 +536,21 @@ def analyze_session_interactions(
             "categories": {}
         }
     
-    # Statistiques globales
-    latencies = [i.response_latency for i in interactions if i.response_latency]
-    pertinent_count = sum(1 for i in interactions if i.est_pertinent is True)
-    evaluated_count = sum(1 for i in interactions if i.est_pertinent is not None)
+    # Les latences nulles ou à 0 ne sont pas comptées
+    avg_latency = stats.sum_latency / stats.count_latency if stats.count_latency else 0
+    evaluated_count = stats.evaluated_count
     
-    # Par catégorie
-    categories = {}
-    for interaction in interactions:
-        cat = interaction.action_category or "non_categorise"
-        if cat not in categories:
-            categories[cat] = 0
-        categories[cat] += 1
+    # Les catégories dont toutes les interactions ont été supprimées restent à 0
+    categories = {
+        category: count
+        for category, count in stats.category_counts.items()
+        if count
+    }
     
     return {
-        "total_interactions": len(interactions),
-        "average_latency": sum(latencies) / len(latencies) if latencies else 0,
-        "pertinent_rate": (pertinent_count / evaluated_count * 100) if evaluated_count > 0 else 0.0,
+        "total_interactions": stats.total_interactions,
+        "average_latency": float(avg_latency),
+        "pertinent_rate": (stats.pertinent_count / evaluated_count * 100) if evaluated_count > 0 else 0.0,
         "categories": categories,
         "evaluated_interactions": evaluated_count
-    }
\ No newline at end of file
+    }
@@ -1,7 +1,9 @@
 """Service d'inférence des connaissances à partir des interactions."""
+from datetime import datetime, timezone
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
-from typing import List, Dict, Any
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 from uuid import UUID
 from app.models.learner_competency_mastery import LearnerCompetencyMastery
 from app.models.competence_clinique import CompetenceClinique
@@ -9,47 +11,85 @@ from app.models.interaction_log import InteractionLog
 from app.services.knowledge_update_service import update_mastery, calculate_confidence
 
 
-def infer_knowledge_from_interaction(
+# Paramètres BKT (p_init, p_transit, p_guess, p_slip) : constantes communes à
+# toutes les compétences (cf. propriétés de CompetenceClinique), tant qu'ils
+# ne sont pas stockés en base
+BKTParams = Tuple[float, float, float, float]
+DEFAULT_BKT_PARAMS: BKTParams = (0.2, 0.15, 0.2, 0.1)
+
+
+def _new_mastery_values(learner_id: int, competence_id: int) -> Dict[str, Any]:
+    """Valeurs d'un enregistrement de maîtrise initialisé avec P(L0)."""
+    return {
+        "learner_id": learner_id,
+        "competence_id": competence_id,
+        "mastery_level": DEFAULT_BKT_PARAMS[0],
+        "nb_success": 0,
+        "nb_failures": 0,
+        "streak_correct": 0
+    }
+
+
+def _get_or_create_masteries(
     db: Session,
     learner_id: int,
-    competence_id: int,
-    score: float,
-    correct: bool = None
-) -> LearnerCompetencyMastery:
+    competence_ids: Iterable[int]
+) -> Dict[int, LearnerCompetencyMastery]:
     """
-    Mettre à jour la maîtrise d'une compétence basée sur une interaction.
+    Récupérer ou créer les maîtrises d'un apprenant.
+    
+    INSERT ... ON CONFLICT DO NOTHING RETURNING crée les lignes manquantes avec
+    P(L0) ; les lignes existantes sont ensuite lues (et verrouillées jusqu'au
+    commit) par un SELECT ... FOR UPDATE.
     
     Args:
         db: Session de base de données
         learner_id: ID de l'apprenant
-        competence_id: ID de la compétence
-        score: Score obtenu (0-100)
-        correct: Réponse correcte ? (optionnel)
+        competence_ids: IDs des compétences
     
     Returns:
-        LearnerCompetencyMastery mis à jour
+        Dictionnaire {competence_id: LearnerCompetencyMastery}
     """
-    # Récupérer la compétence pour les paramètres BKT
-    competence = db.query(CompetenceClinique).filter(CompetenceClinique.id == competence_id).first()
-    
-    # Récupérer ou créer l'enregistrement de maîtrise
-    mastery = db.query(LearnerCompetencyMastery).filter(
-        LearnerCompetencyMastery.learner_id == learner_id,
-        LearnerCompetencyMastery.competence_id == competence_id
-    ).first()
-    
-    if not mastery:
-        mastery = LearnerCompetencyMastery(
-            learner_id=learner_id,
-            competence_id=competence_id,
-            mastery_level=competence.p_init if competence else 0.2,
-            nb_success=0,
-            nb_failures=0,
-            streak_correct=0
+    competence_ids = set(competence_ids)
+    
+    stmt = pg_insert(LearnerCompetencyMastery).values([
+        _new_mastery_values(learner_id, competence_id)
+        for competence_id in competence_ids
+    ]).on_conflict_do_nothing(
+        index_elements=[LearnerCompetencyMastery.learner_id, LearnerCompetencyMastery.competence_id]
+    ).returning(LearnerCompetencyMastery)
+    
+    masteries = {m.competence_id: m for m in db.scalars(stmt)}
+    
+    existing_ids = competence_ids - masteries.keys()
+    if existing_ids:
+        existing = db.scalars(
+            select(LearnerCompetencyMastery)
+            .where(
+                LearnerCompetencyMastery.learner_id == learner_id,
+                LearnerCompetencyMastery.competence_id.in_(existing_ids)
+            )
+            .with_for_update(),
+            execution_options={"populate_existing": True}
         )
-        db.add(mastery)
-        db.flush()
+        masteries.update((m.competence_id, m) for m in existing)
+    
+    return masteries
+
+
+def _apply_observation(
+    mastery: LearnerCompetencyMastery,
+    score: float,
+    correct: bool = None
+) -> None:
+    """
+    Appliquer une observation (statistiques + BKT + confiance) sans commit.
     
+    Args:
+        mastery: Enregistrement de maîtrise à mettre à jour
+        score: Score obtenu (0-100)
+        correct: Réponse correcte ? (optionnel)
+    """
     # Mettre à jour les statistiques
     is_correct = correct if correct is not None else (score >= 50)
     
@@ -61,20 +101,17 @@ def infer_knowledge_from_interaction(
         mastery.streak_correct = 0
     
     # Mettre à jour le niveau de maîtrise avec BKT
-    if competence:
-        new_mastery = update_mastery(
-            mastery.mastery_level or 0.2,
-            score,
-            correct=correct,
-            p_transit=competence.p_transit,
-            p_guess=competence.p_guess,
-            p_slip=competence.p_slip,
-        )
-    else:
-        new_mastery = update_mastery(mastery.mastery_level or 0.2, score, correct=correct)
-    
-    mastery.mastery_level = new_mastery
-    mastery.last_practice_date = func.now()
+    _, p_transit, p_guess, p_slip = DEFAULT_BKT_PARAMS
+    mastery.mastery_level = update_mastery(
+        mastery.mastery_level or 0.2,
+        score,
+        correct=correct,
+        p_transit=p_transit,
+        p_guess=p_guess,
+        p_slip=p_slip,
+    )
+    # Horodatage côté client : la valeur est connue sans relire la ligne
+    mastery.last_practice_date = datetime.now(timezone.utc)
     
     # Calculer la confiance
     mastery.confidence = calculate_confidence(
@@ -82,12 +119,79 @@ def infer_knowledge_from_interaction(
         mastery.nb_failures or 0,
         mastery.streak_correct or 0
     )
+
+
+def infer_knowledge_from_interaction(
+    db: Session,
+    learner_id: int,
+    competence_id: int,
+    score: float,
+    correct: bool = None
+) -> LearnerCompetencyMastery:
+    """
+    Mettre à jour la maîtrise d'une compétence basée sur une interaction.
+    
+    Args:
+        db: Session de base de données
+        learner_id: ID de l'apprenant
+        competence_id: ID de la compétence
+        score: Score obtenu (0-100)
+        correct: Réponse correcte ? (optionnel)
+    
+    Returns:
+        LearnerCompetencyMastery mis à jour
+    """
+    # Récupérer ou créer l'enregistrement de maîtrise (upsert)
+    mastery = _get_or_create_masteries(db, learner_id, [competence_id])[competence_id]
+    
+    _apply_observation(mastery, score, correct)
     
     db.commit()
-    db.refresh(mastery)
     return mastery
 
 
+def infer_knowledge_from_scores(
+    db: Session,
+    learner_id: int,
+    competence_scores: Dict[int, float],
+    commit: bool = True
+) -> List[LearnerCompetencyMastery]:
+    """
+    Mettre à jour plusieurs maîtrises d'un apprenant en une seule transaction.
+    
+    Les maîtrises sont récupérées ou créées en deux requêtes au plus ; les mises
+    à jour BKT sont faites en mémoire puis validées par un unique commit.
+    
+    Args:
+        db: Session de base de données
+        learner_id: ID de l'apprenant
+        competence_scores: Dictionnaire {competence_id: score}
+        commit: Valider la transaction (False pour laisser l'appelant
+            regrouper plusieurs écritures dans un seul commit)
+    
+    Returns:
+        Liste des maîtrises mises à jour (dans l'ordre de competence_scores)
+    """
+    if not competence_scores:
+        return []
+    
+    masteries = _get_or_create_masteries(db, learner_id, competence_scores.keys())
+    
+    updated_masteries = []
+    
+    for competence_id, score in competence_scores.items():
+        mastery = masteries[competence_id]
+        _apply_observation(mastery, score)
+        updated_masteries.append(mastery)
+    
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+    
+    return updated_masteries
+
+
 def infer_knowledge_from_session(
     db: Session,
     session_id: UUID,
@@ -107,22 +211,11 @@ def infer_knowledge_from_session(
     from app.models.simulation_session import SimulationSession
     
     # Récupérer la session
-    session = db.query(SimulationSession).filter(SimulationSession.id == session_id).first()
+    session = db.get(SimulationSession, session_id)
     if not session:
         raise ValueError(f"Session {session_id} non trouvée")
     
-    updated_masteries = []
-    
-    for competence_id, score in competence_scores.items():
-        mastery = infer_knowledge_from_interaction(
-            db,
-            session.learner_id,
-            competence_id,
-            score
-        )
-        updated_masteries.append(mastery)
-    
-    return updated_masteries
+    return infer_knowledge_from_scores(db, session.learner_id, competence_scores)
 
 
 def extract_competences_from_actions(
@@ -139,26 +232,21 @@ def extract_competences_from_actions(
     Returns:
         Dictionnaire {competence_id: [liste de scores]}
     """
-    interactions = db.query(InteractionLog).filter(
-        InteractionLog.session_id == session_id
-    ).all()
+    # Extraction de competence_id et score côté SQL, limitée aux interactions
+    # qui en portent (index partiel ix_interaction_session_competence)
+    competence = InteractionLog.action_content["competence_id"]
+    rows = db.query(competence, InteractionLog.action_content["score"]).filter(
+        InteractionLog.session_id == session_id,
+        competence.as_string().isnot(None)
+    ).execution_options(stream_results=True).yield_per(1000)
     
     competence_scores: Dict[int, List[float]] = {}
     
-    for interaction in interactions:
-        if not interaction.action_content:
-            continue
-        
-        # Extraire competence_id et score du contenu JSON
-        content = interaction.action_content
-        if isinstance(content, dict):
-            comp_id = content.get('competence_id')
-            score = content.get('score')
-            
-            if comp_id and score is not None:
-                if comp_id not in competence_scores:
-                    competence_scores[comp_id] = []
-                competence_scores[comp_id].append(float(score))
+    for comp_id, score in rows:
+        if comp_id and score is not None:
+            if comp_id not in competence_scores:
+                competence_scores[comp_id] = []
+            competence_scores[comp_id].append(float(score))
     
     return competence_scores
 
@@ -177,11 +265,15 @@ def get_learner_knowledge_summary(
     Returns:
         Dictionnaire avec statistiques
     """
-    masteries = db.query(LearnerCompetencyMastery).filter(
+    # Une seule requête : maîtrises + compétences associées
+    rows = db.query(LearnerCompetencyMastery, CompetenceClinique).outerjoin(
+        CompetenceClinique,
+        CompetenceClinique.id == LearnerCompetencyMastery.competence_id
+    ).filter(
         LearnerCompetencyMastery.learner_id == learner_id
     ).all()
     
-    if not masteries:
+    if not rows:
         return {
             "learner_id": learner_id,
             "total_competences": 0,
@@ -190,14 +282,13 @@ def get_learner_knowledge_summary(
             "competences": []
         }
     
-    total_mastery = sum(m.mastery_level or 0 for m in masteries)
-    average_mastery = total_mastery / len(masteries)
-    mastered = sum(1 for m in masteries if (m.mastery_level or 0) >= 0.8)
+    total_mastery = sum(m.mastery_level or 0 for m, _ in rows)
+    average_mastery = total_mastery / len(rows)
+    mastered = sum(1 for m, _ in rows if (m.mastery_level or 0) >= 0.8)
     
     # Détails par compétence
     competences_details = []
-    for m in masteries:
-        comp = db.query(CompetenceClinique).filter(CompetenceClinique.id == m.competence_id).first()
+    for m, comp in rows:
         competences_details.append({
             "competence_id": m.competence_id,
             "competence_code": comp.code_competence if comp else "Unknown",
@@ -214,7 +305,7 @@ def get_learner_knowledge_summary(
     
     return {
         "learner_id": learner_id,
-        "total_competences": len(masteries),
+        "total_competences": len(rows),
         "average_mastery": round(average_mastery, 2),
         "mastered_competences": mastered,
         "competences": competences_details
@@ -224,7 +315,8 @@ def get_learner_knowledge_summary(
 def identify_weak_competences(
     db: Session,
     learner_id: int,
-    threshold: float = 0.5
+    threshold: float = 0.5,
+    limit: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     """
     Identifier les compétences faibles d'un apprenant.
@@ -233,18 +325,27 @@ def identify_weak_competences(
         db: Session de base de données
         learner_id: ID de l'apprenant
         threshold: Seuil de maîtrise
+        limit: Nombre maximum de compétences renvoyées (toutes si None)
     
     Returns:
-        Liste des compétences faibles
+        Liste des compétences faibles, les plus faibles en premier
     """
-    masteries = db.query(LearnerCompetencyMastery).filter(
+    # Tri et limite faits en SQL (parcours de l'index learner_id, mastery_level)
+    query = db.query(LearnerCompetencyMastery, CompetenceClinique).outerjoin(
+        CompetenceClinique,
+        CompetenceClinique.id == LearnerCompetencyMastery.competence_id
+    ).filter(
         LearnerCompetencyMastery.learner_id == learner_id,
         LearnerCompetencyMastery.mastery_level < threshold
-    ).all()
+    ).order_by(LearnerCompetencyMastery.mastery_level.asc())
+    
+    if limit is not None:
+        query = query.limit(limit)
+    
+    rows = query.all()
     
     weak_competences = []
-    for m in masteries:
-        comp = db.query(CompetenceClinique).filter(CompetenceClinique.id == m.competence_id).first()
+    for m, comp in rows:
         weak_competences.append({
             "competence_id": m.competence_id,
             "competence_code": comp.code_competence if comp else "Unknown",
@@ -254,7 +355,4 @@ def identify_weak_competences(
             "priority": "haute" if (m.mastery_level or 0) < 0.3 else "moyenne"
         })
     
-    # Trier par niveau de maîtrise croissant (les plus faibles en premier)
-    weak_competences.sort(key=lambda x: x["mastery_level"])
-    
     return weak_competences
\ No newline at end of file
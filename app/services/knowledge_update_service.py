@@ -1,9 +1,17 @@
 """Service de mise à jour du modèle de connaissances (BKT)."""
 
+from bisect import bisect_right
 
-def _clamp01(value: float) -> float:
-    """Borne une probabilité dans [0, 1]."""
-    return max(0.0, min(1.0, value))
+
+# Seuils de maîtrise et labels associés (borne basse incluse)
+_MASTERY_THRESHOLDS = (0.2, 0.4, 0.6, 0.8)
+_MASTERY_LABELS = (
+    "Non maîtrisé",
+    "Faiblement maîtrisé",
+    "Partiellement maîtrisé",
+    "Bien maîtrisé",
+    "Excellemment maîtrisé",
+)
 
 
 def score_to_correct(score: float, threshold: float = 50.0) -> bool:
@@ -40,27 +48,43 @@ def bkt_update(
     Returns:
         Nouvelle probabilité de maîtrise
     """
-    p_mastery = _clamp01(p_mastery)
-    p_transit = _clamp01(p_transit)
-    p_guess = _clamp01(p_guess)
-    p_slip = _clamp01(p_slip)
-
-    if correct:
-        # Observation = réponse correcte
-        # P(Correct) = P(L)*(1-slip) + (1-P(L))*guess
-        denom = (p_mastery * (1.0 - p_slip)) + ((1.0 - p_mastery) * p_guess)
-        # Posterior: P(L|Correct) = P(L)*P(Correct|L) / P(Correct)
-        p_given_obs = (p_mastery * (1.0 - p_slip)) / denom if denom else p_mastery
+    # Bornage des probabilités dans [0, 1], en ligne (chemin critique) ;
+    # même résultat que max(0.0, min(1.0, x)), NaN compris (borné à 1.0)
+    p = (p_mastery if p_mastery > 0.0 else 0.0) if p_mastery < 1.0 else 1.0
+    p_transit = (p_transit if p_transit > 0.0 else 0.0) if p_transit < 1.0 else 1.0
+    p_guess = (p_guess if p_guess > 0.0 else 0.0) if p_guess < 1.0 else 1.0
+    p_slip = (p_slip if p_slip > 0.0 else 0.0) if p_slip < 1.0 else 1.0
+
+    if p_guess == 0.0 and p_slip == 0.0:
+        # Évaluation déterministe : la réponse révèle l'état de maîtrise.
+        # Mêmes valeurs que la formule générale (y compris les cas 0/0 où
+        # le posterior retombe sur P(L))
+        if correct:
+            p_given_obs = 1.0 if p > 0.0 else p
+        else:
+            p_given_obs = 0.0 if p < 1.0 else p
     else:
-        # Observation = réponse incorrecte
-        # P(Incorrect) = P(L)*slip + (1-P(L))*(1-guess)
-        denom = (p_mastery * p_slip) + ((1.0 - p_mastery) * (1.0 - p_guess))
-        # Posterior: P(L|Incorrect) = P(L)*P(Incorrect|L) / P(Incorrect)
-        p_given_obs = (p_mastery * p_slip) / denom if denom else p_mastery
+        one_minus_p = 1.0 - p
+
+        if correct:
+            # Observation = réponse correcte
+            # P(Correct) = P(L)*(1-slip) + (1-P(L))*guess
+            num = p * (1.0 - p_slip)
+            denom = num + (one_minus_p * p_guess)
+        else:
+            # Observation = réponse incorrecte
+            # P(Incorrect) = P(L)*slip + (1-P(L))*(1-guess)
+            num = p * p_slip
+            denom = num + (one_minus_p * (1.0 - p_guess))
+
+        # Posterior: P(L|Obs) = P(L)*P(Obs|L) / P(Obs)
+        p_given_obs = num / denom if denom else p
 
     # Transition (apprentissage entre 2 tentatives)
+    if p_transit == 0.0:
+        return p_given_obs
     p_next = p_given_obs + (1.0 - p_given_obs) * p_transit
-    return _clamp01(p_next)
+    return (p_next if p_next > 0.0 else 0.0) if p_next < 1.0 else 1.0
 
 
 def update_mastery(
@@ -114,9 +138,23 @@ def calculate_mastery_from_history(scores: list[float]) -> float:
     if not scores:
         return 0.2
 
+    # Récurrence BKT déroulée avec les paramètres par défaut d'update_mastery :
+    # mêmes calculs que bkt_update, sans appel de fonction par score
+    p_transit, p_guess, p_slip = 0.15, 0.2, 0.1
+    one_minus_slip = 1.0 - p_slip
+    one_minus_guess = 1.0 - p_guess
+
     p = 0.2
     for s in scores:
-        p = update_mastery(p, s)
+        if s >= 50.0:
+            num = p * one_minus_slip
+            denom = num + ((1.0 - p) * p_guess)
+        else:
+            num = p * p_slip
+            denom = num + ((1.0 - p) * one_minus_guess)
+        p_given_obs = num / denom if denom else p
+        p = p_given_obs + (1.0 - p_given_obs) * p_transit
+        p = 0.0 if p < 0.0 else (1.0 if p > 1.0 else p)
     return p
 
 
@@ -130,16 +168,7 @@ def get_mastery_label(mastery_level: float) -> str:
     Returns:
         Label descriptif
     """
-    if mastery_level < 0.2:
-        return "Non maîtrisé"
-    elif mastery_level < 0.4:
-        return "Faiblement maîtrisé"
-    elif mastery_level < 0.6:
-        return "Partiellement maîtrisé"
-    elif mastery_level < 0.8:
-        return "Bien maîtrisé"
-    else:
-        return "Excellemment maîtrisé"
+    return _MASTERY_LABELS[bisect_right(_MASTERY_THRESHOLDS, mastery_level)]
 
 
 def calculate_confidence(
@@ -1,4 +1,6 @@
 """Service métier pour les apprenants."""
+from sqlalchemy import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from app.models.learner import Learner
 from app.schemas.learner import LearnerCreate, LearnerUpdate
@@ -16,6 +18,26 @@ class LearnerService:
         db.refresh(db_learner)
         return db_learner
     
+    @staticmethod
+    def create_learners(db: Session, learners: list[LearnerCreate]) -> list[Row]:
+        """
+        Créer plusieurs apprenants en une seule transaction.
+        
+        INSERT multi-lignes avec RETURNING (découpé en pages par
+        insertmanyvalues) et un unique commit, au lieu d'un INSERT
+        et d'un COMMIT par apprenant.
+        """
+        if not learners:
+            return []
+        
+        table = Learner.__table__
+        rows = db.execute(
+            insert(table).returning(*table.c, sort_by_parameter_order=True),
+            [learner.model_dump() for learner in learners]
+        ).all()
+        db.commit()
+        return rows
+    
     @staticmethod
     def get_learner(db: Session, learner_id: int) -> Learner:
         """Récupérer un apprenant par ID."""
@@ -1,4 +1,5 @@
 """Service pour les pathologies."""
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.models.pathologie import Pathologie
@@ -8,16 +9,23 @@ def get_all_pathologies(
     db: Session,
     skip: int = 0,
     limit: int = 100,
-    categorie: Optional[str] = None
+    categorie: Optional[str] = None,
+    after_id: Optional[int] = None
 ) -> List[Pathologie]:
     """
-    Récupérer toutes les pathologies avec filtres.
+    Récupérer toutes les pathologies avec filtres, triées par ID.
+    
+    Avec `after_id` (ID de la dernière pathologie de la page précédente),
+    la pagination se fait par curseur : WHERE id > after_id, servi par la
+    clé primaire quelle que soit la profondeur de page ; `skip` est alors
+    ignoré.
     
     Args:
         db: Session de base de données
-        skip: Nombre de résultats à sauter
+        skip: Nombre de résultats à sauter (pagination par offset)
         limit: Nombre maximum de résultats
         categorie: Filtrer par catégorie
+        after_id: Curseur de pagination (ID exclu)
     
     Returns:
         Liste des pathologies
@@ -27,7 +35,12 @@ def get_all_pathologies(
     if categorie:
         query = query.filter(Pathologie.categorie == categorie)
     
-    return query.offset(skip).limit(limit).all()
+    if after_id is not None:
+        query = query.filter(Pathologie.id > after_id)
+    else:
+        query = query.offset(skip)
+    
+    return query.order_by(Pathologie.id).limit(limit).all()
 
 
 def get_pathologie_by_id(db: Session, pathologie_id: int) -> Optional[Pathologie]:
@@ -64,7 +77,11 @@ def search_pathologies(
     limit: int = 20
 ) -> List[Pathologie]:
     """
-    Rechercher des pathologies par nom.
+    Rechercher des pathologies par nom ou description.
+    
+    Correspondance plein texte (lexèmes français sur le nom et la
+    description) ou sous-chaîne du nom ; les résultats plein texte les
+    plus pertinents viennent en premier.
     
     Args:
         db: Session de base de données
@@ -74,9 +91,18 @@ def search_pathologies(
     Returns:
         Liste des pathologies trouvées
     """
+    # search_vec @@ tsquery servi par ix_pathologie_search_vec, ILIKE
+    # '%terme%' (saisie partielle d'un nom) par ix_pathologie_nom_trgm
+    ts_query = func.plainto_tsquery("french", search_term)
     search_pattern = f"%{search_term}%"
     return db.query(Pathologie).filter(
-        Pathologie.nom_fr.ilike(search_pattern)
+        or_(
+            Pathologie.search_vec.op("@@")(ts_query),
+            Pathologie.nom_fr.ilike(search_pattern)
+        )
+    ).order_by(
+        func.ts_rank(Pathologie.search_vec, ts_query).desc(),
+        Pathologie.id
     ).limit(limit).all()
 
 
@@ -1,11 +1,25 @@
 """Service d'analyse des performances basé sur SimulationSession."""
-from typing import List, Dict, Any
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, select
 from app.models.simulation_session import SimulationSession
 from app.models.cas_clinique import CasCliniqueEnrichi
 
 
+# Cache des résumés de performance par apprenant (LRU borné, avec TTL).
+# Chaque entrée porte la « version » des sessions terminées au moment du
+# calcul (nombre, dernière fin) : une session terminée par un autre processus
+# invalide aussi l'entrée.
+SUMMARY_CACHE_TTL_S = 300
+_SUMMARY_CACHE_MAXSIZE = 1024
+_SUMMARY_CACHE: "OrderedDict[int, Tuple[Any, float, Dict[str, Any]]]" = OrderedDict()
+_SUMMARY_CACHE_LOCK = threading.Lock()
+
+
 def compute_progress(scores: List[float]) -> float:
     """
     Calcul simple de la progression.
@@ -71,6 +85,11 @@ def compute_trend(scores: List[float]) -> str:
         return "stable"
 
 
+# Label par tranche de 10 points (indice = score // 10, borné à [0, 10]) :
+# < 40 faible, < 60 moyen, < 80 bon, sinon excellent
+_PERFORMANCE_LABELS = ("faible",) * 4 + ("moyen",) * 2 + ("bon",) * 2 + ("excellent",) * 3
+
+
 def performance_indicator(score: float) -> str:
     """
     Indicateur qualitatif de performance.
@@ -81,63 +100,141 @@ def performance_indicator(score: float) -> str:
     Returns:
         Label: "excellent", "bon", "moyen", ou "faible"
     """
-    if score >= 80:
-        return "excellent"
-    elif score >= 60:
-        return "bon"
-    elif score >= 40:
-        return "moyen"
-    else:
-        return "faible"
+    return _PERFORMANCE_LABELS[min(max(int(score // 10), 0), 10)]
+
+
+def get_trend_scores(
+    db: Session,
+    learner_id: int,
+    nb_scores: int,
+    head: int = 3,
+    tail: int = 3
+) -> List[float]:
+    """
+    Obtenir les scores utiles au calcul de la tendance et de la progression.
+    
+    Seuls les `head` premiers et les `tail` derniers scores (ordre
+    chronologique) sont lus : compute_trend et compute_progress n'utilisent
+    que les extrémités de la série.
+    
+    Args:
+        db: Session de base de données
+        learner_id: ID de l'apprenant
+        nb_scores: Nombre de sessions terminées ayant un score
+        head: Nombre de premiers scores à lire
+        tail: Nombre de derniers scores à lire
+    
+    Returns:
+        Scores en ordre chronologique (série complète si elle est courte)
+    """
+    query = db.query(SimulationSession.score_final).filter(
+        SimulationSession.learner_id == learner_id,
+        SimulationSession.statut == "termine",
+        SimulationSession.score_final.isnot(None)
+    )
+    
+    if nb_scores <= head + tail:
+        return [score for (score,) in query.order_by(SimulationSession.start_time.asc())]
+    
+    earliest = [
+        score for (score,) in query.order_by(SimulationSession.start_time.asc()).limit(head)
+    ]
+    latest = [
+        score for (score,) in query.order_by(SimulationSession.start_time.desc()).limit(tail)
+    ]
+    return earliest + latest[::-1]
+
+
+def _empty_performance_stats(learner_id: int, include_sessions: bool = True) -> Dict[str, Any]:
+    """Statistiques d'un apprenant sans session terminée."""
+    stats = {
+        "learner_id": learner_id,
+        "total_sessions": 0,
+        "average_score": 0.0,
+        "best_score": 0.0,
+        "worst_score": 0.0,
+        "trend": "stable",
+        "total_time_spent": 0
+    }
+    
+    if include_sessions:
+        stats["sessions"] = []
+    
+    return stats
 
 
 def get_learner_performance_stats(
     db: Session,
-    learner_id: int
+    learner_id: int,
+    include_sessions: bool = False
 ) -> Dict[str, Any]:
     """
     Obtenir les statistiques de performance d'un apprenant.
     
+    Les agrégats (nombre, moyenne, extrêmes, temps) sont calculés en SQL,
+    la tendance à partir des seuls premiers et derniers scores ; le détail
+    des sessions n'est chargé que sur demande.
+    
     Args:
         db: Session de base de données
         learner_id: ID de l'apprenant
+        include_sessions: Inclure le détail des sessions terminées
     
     Returns:
         Dictionnaire avec statistiques
     """
-    # Récupérer toutes les sessions terminées
-    sessions = db.query(SimulationSession).filter(
+    completed = (
         SimulationSession.learner_id == learner_id,
         SimulationSession.statut == "termine"
-    ).order_by(SimulationSession.start_time).all()
-    
-    if not sessions:
-        return {
-            "learner_id": learner_id,
-            "total_sessions": 0,
-            "average_score": 0.0,
-            "best_score": 0.0,
-            "worst_score": 0.0,
-            "trend": "stable",
-            "total_time_spent": 0,
-            "sessions": []
-        }
-    
-    scores = [s.score_final for s in sessions if s.score_final is not None]
-    times = [s.temps_total for s in sessions if s.temps_total]
+    )
+    
+    total, nb_scores, avg_score, best_score, worst_score, total_time, nb_timed = db.query(
+        func.count(SimulationSession.id),
+        func.count(SimulationSession.score_final),
+        func.avg(SimulationSession.score_final),
+        func.max(SimulationSession.score_final),
+        func.min(SimulationSession.score_final),
+        func.coalesce(func.sum(SimulationSession.temps_total), 0),
+        # Les temps nuls ou à 0 ne comptent pas dans la moyenne
+        func.count(func.nullif(SimulationSession.temps_total, 0))
+    ).filter(*completed).one()
+    
+    if not total:
+        return _empty_performance_stats(learner_id, include_sessions)
+    
+    if include_sessions:
+        # Colonnes lues seulement : pas d'hydratation d'objets ORM
+        sessions = db.execute(
+            select(
+                SimulationSession.id,
+                SimulationSession.cas_clinique_id,
+                SimulationSession.score_final,
+                SimulationSession.temps_total,
+                SimulationSession.start_time,
+                SimulationSession.raison_fin
+            ).where(*completed).order_by(SimulationSession.start_time)
+        ).all()
+        scores = [s.score_final for s in sessions if s.score_final is not None]
+    else:
+        # Premiers et derniers scores seulement (tendance et progression)
+        sessions = []
+        scores = get_trend_scores(db, learner_id, nb_scores)
     
-    return {
+    stats = {
         "learner_id": learner_id,
-        "total_sessions": len(sessions),
-        "completed_sessions": len(sessions),
-        "average_score": round(compute_average_score(scores), 2),
-        "best_score": max(scores) if scores else 0.0,
-        "worst_score": min(scores) if scores else 0.0,
+        "total_sessions": total,
+        "completed_sessions": total,
+        "average_score": round(avg_score, 2) if avg_score is not None else 0.0,
+        "best_score": best_score if best_score is not None else 0.0,
+        "worst_score": worst_score if worst_score is not None else 0.0,
         "progress": round(compute_progress(scores), 2),
         "trend": compute_trend(scores),
-        "total_time_spent": sum(times) if times else 0,
-        "average_time_per_session": round(sum(times) / len(times), 2) if times else 0,
-        "sessions": [
+        "total_time_spent": total_time,
+        "average_time_per_session": round(total_time / nb_timed, 2) if nb_timed else 0
+    }
+    
+    if include_sessions:
+        stats["sessions"] = [
             {
                 "id": str(s.id),
                 "cas_clinique_id": s.cas_clinique_id,
@@ -149,7 +246,8 @@ def get_learner_performance_stats(
             }
             for s in sessions
         ]
-    }
+    
+    return stats
 
 
 def get_performance_by_difficulty(
@@ -166,44 +264,57 @@ def get_performance_by_difficulty(
     Returns:
         Dictionnaire {niveau_difficulte: statistiques}
     """
-    sessions = db.query(SimulationSession).filter(
+    # Agrégats par niveau calculés en SQL (GROUP BY sur la jointure)
+    rows = db.query(
+        CasCliniqueEnrichi.niveau_difficulte,
+        func.count(SimulationSession.id),
+        func.avg(SimulationSession.score_final),
+        func.max(SimulationSession.score_final),
+        func.count(SimulationSession.score_final),
+        func.count(case((SimulationSession.score_final >= 60, 1)))
+    ).join(
+        CasCliniqueEnrichi,
+        CasCliniqueEnrichi.id == SimulationSession.cas_clinique_id
+    ).filter(
         SimulationSession.learner_id == learner_id,
-        SimulationSession.statut == "termine"
-    ).all()
+        SimulationSession.statut == "termine",
+        CasCliniqueEnrichi.niveau_difficulte.isnot(None),
+        CasCliniqueEnrichi.niveau_difficulte != 0
+    ).group_by(CasCliniqueEnrichi.niveau_difficulte).all()
     
-    # Grouper par niveau de difficulté
-    by_difficulty = {}
+    return {
+        level: {
+            "niveau_difficulte": level,
+            "nb_sessions": nb_sessions,
+            "average_score": round(avg_score, 2) if avg_score is not None else 0.0,
+            "best_score": best_score if best_score is not None else 0.0,
+            "success_rate": nb_success / nb_scores * 100 if nb_scores else 0.0
+        }
+        for level, nb_sessions, avg_score, best_score, nb_scores, nb_success in rows
+    }
+
+
+def _difficulty_stats(
+    by_difficulty: Dict[int, Dict[str, Any]]
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Calculer les statistiques par niveau à partir des sessions groupées.
     
-    for session in sessions:
-        case = db.query(CasCliniqueEnrichi).filter(
-            CasCliniqueEnrichi.id == session.cas_clinique_id
-        ).first()
-        
-        if not case or not case.niveau_difficulte:
-            continue
-        
-        level = case.niveau_difficulte
-        
-        if level not in by_difficulty:
-            by_difficulty[level] = {
-                "sessions": [],
-                "scores": []
-            }
-        
-        by_difficulty[level]["sessions"].append(session)
-        if session.score_final is not None:
-            by_difficulty[level]["scores"].append(session.score_final)
+    Args:
+        by_difficulty: {niveau: {"nb_sessions": int, "scores": [scores]}}
     
-    # Calculer les statistiques par niveau
+    Returns:
+        Dictionnaire {niveau_difficulte: statistiques}
+    """
     stats = {}
     for level, data in by_difficulty.items():
         scores = data["scores"]
         stats[level] = {
             "niveau_difficulte": level,
-            "nb_sessions": len(data["sessions"]),
+            "nb_sessions": data["nb_sessions"],
             "average_score": round(compute_average_score(scores), 2),
             "best_score": max(scores) if scores else 0.0,
-            "success_rate": len([s for s in scores if s >= 60]) / len(scores) * 100 if scores else 0.0
+            "success_rate": sum(1 for s in scores if s >= 60) / len(scores) * 100 if scores else 0.0
         }
     
     return stats
@@ -212,7 +323,8 @@ def get_performance_by_difficulty(
 def identify_weak_cases(
     db: Session,
     learner_id: int,
-    threshold: float = 60.0
+    threshold: float = 60.0,
+    limit: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     """
     Identifier les cas où l'apprenant a eu des difficultés.
@@ -221,40 +333,65 @@ def identify_weak_cases(
         db: Session de base de données
         learner_id: ID de l'apprenant
         threshold: Seuil de score (défaut: 60)
+        limit: Nombre maximum de cas renvoyés (tous si None)
     
     Returns:
-        Liste des cas difficiles
+        Liste des cas difficiles, les plus faibles scores en premier
     """
-    sessions = db.query(SimulationSession).filter(
+    # Sessions et champs du cas en une seule requête, triées par score croissant
+    query = db.query(
+        SimulationSession.id,
+        SimulationSession.score_final,
+        SimulationSession.start_time,
+        CasCliniqueEnrichi.id,
+        CasCliniqueEnrichi.code_fultang,
+        CasCliniqueEnrichi.niveau_difficulte,
+        CasCliniqueEnrichi.pathologie_principale_id
+    ).join(
+        CasCliniqueEnrichi,
+        CasCliniqueEnrichi.id == SimulationSession.cas_clinique_id
+    ).filter(
         SimulationSession.learner_id == learner_id,
         SimulationSession.statut == "termine",
         SimulationSession.score_final < threshold
-    ).all()
-    
-    weak_cases = []
-    
-    for session in sessions:
-        case = db.query(CasCliniqueEnrichi).filter(
-            CasCliniqueEnrichi.id == session.cas_clinique_id
-        ).first()
-        
-        if case:
-            weak_cases.append({
-                "session_id": str(session.id),
-                "cas_clinique_id": case.id,
-                "code_fultang": case.code_fultang,
-                "niveau_difficulte": case.niveau_difficulte,
-                "score": session.score_final,
-                "pathologie_id": case.pathologie_principale_id,
-                "date": session.start_time.isoformat() if session.start_time else None
-            })
+    ).order_by(SimulationSession.score_final.asc())
     
-    # Trier par score croissant
-    weak_cases.sort(key=lambda x: x["score"])
+    if limit is not None:
+        rows = query.limit(limit).all()
+    else:
+        # Liste complète : lecture en flux côté serveur, par lots
+        rows = query.execution_options(stream_results=True).yield_per(500)
+    
+    weak_cases = [
+        {
+            "session_id": str(session_id),
+            "cas_clinique_id": cas_id,
+            "code_fultang": code_fultang,
+            "niveau_difficulte": niveau_difficulte,
+            "score": score_final,
+            "pathologie_id": pathologie_id,
+            "date": start_time.isoformat() if start_time else None
+        }
+        for (
+            session_id, score_final, start_time,
+            cas_id, code_fultang, niveau_difficulte, pathologie_id
+        ) in rows
+    ]
     
     return weak_cases
 
 
+def invalidate_performance_summary(learner_id: int) -> None:
+    """
+    Invalider le résumé de performance mis en cache pour un apprenant.
+    
+    Args:
+        learner_id: ID de l'apprenant
+    """
+    with _SUMMARY_CACHE_LOCK:
+        _SUMMARY_CACHE.pop(learner_id, None)
+
+
 def get_performance_summary(
     db: Session,
     learner_id: int
@@ -262,6 +399,10 @@ def get_performance_summary(
     """
     Obtenir un résumé complet des performances.
     
+    Le résumé est mis en cache par apprenant ; une requête de sonde
+    (nombre de sessions terminées, dernière fin) vérifie qu'il est à jour.
+    Le dictionnaire renvoyé est partagé par le cache : ne pas le modifier.
+    
     Args:
         db: Session de base de données
         learner_id: ID de l'apprenant
@@ -269,22 +410,169 @@ def get_performance_summary(
     Returns:
         Résumé complet
     """
-    general_stats = get_learner_performance_stats(db, learner_id)
-    by_difficulty = get_performance_by_difficulty(db, learner_id)
-    weak_cases = identify_weak_cases(db, learner_id)
+    version = tuple(db.query(
+        func.count(SimulationSession.id),
+        func.max(SimulationSession.end_time)
+    ).filter(
+        SimulationSession.learner_id == learner_id,
+        SimulationSession.statut == "termine"
+    ).one())
+    now = time.monotonic()
+    
+    with _SUMMARY_CACHE_LOCK:
+        entry = _SUMMARY_CACHE.get(learner_id)
+        if entry is not None:
+            cached_version, cached_at, summary = entry
+            if cached_version == version and now - cached_at < SUMMARY_CACHE_TTL_S:
+                _SUMMARY_CACHE.move_to_end(learner_id)
+                return summary
+    
+    summary = _compute_performance_summary(db, learner_id)
+    
+    with _SUMMARY_CACHE_LOCK:
+        _SUMMARY_CACHE[learner_id] = (version, now, summary)
+        _SUMMARY_CACHE.move_to_end(learner_id)
+        if len(_SUMMARY_CACHE) > _SUMMARY_CACHE_MAXSIZE:
+            _SUMMARY_CACHE.popitem(last=False)
+    
+    return summary
+
+
+def _compute_performance_summary(
+    db: Session,
+    learner_id: int
+) -> Dict[str, Any]:
+    """
+    Calculer le résumé complet des performances (sans cache).
+    
+    Args:
+        db: Session de base de données
+        learner_id: ID de l'apprenant
+    
+    Returns:
+        Résumé complet
+    """
+    # Une seule requête (sessions terminées + champs du cas), lue en flux
+    # côté serveur, puis un seul parcours alimentant les trois résultats
+    rows = db.query(
+        SimulationSession.id,
+        SimulationSession.cas_clinique_id,
+        SimulationSession.score_final,
+        SimulationSession.temps_total,
+        SimulationSession.start_time,
+        SimulationSession.raison_fin,
+        CasCliniqueEnrichi.id,
+        CasCliniqueEnrichi.code_fultang,
+        CasCliniqueEnrichi.niveau_difficulte,
+        CasCliniqueEnrichi.pathologie_principale_id
+    ).outerjoin(
+        CasCliniqueEnrichi,
+        CasCliniqueEnrichi.id == SimulationSession.cas_clinique_id
+    ).filter(
+        SimulationSession.learner_id == learner_id,
+        SimulationSession.statut == "termine"
+    ).order_by(SimulationSession.start_time).execution_options(
+        stream_results=True
+    ).yield_per(500)
+    
+    scores = []
+    times = []
+    sessions = []
+    groups: Dict[int, Dict[str, Any]] = {}
+    weak_cases = []
+    
+    for (
+        session_id, cas_clinique_id, score_final, temps_total, start_time, raison_fin,
+        cas_id, code_fultang, niveau_difficulte, pathologie_id
+    ) in rows:
+        # Statistiques générales
+        if score_final is not None:
+            scores.append(score_final)
+        if temps_total:
+            times.append(temps_total)
+        sessions.append({
+            "id": str(session_id),
+            "cas_clinique_id": cas_clinique_id,
+            "score": score_final,
+            "indicator": performance_indicator(score_final) if score_final else "N/A",
+            "temps_total": temps_total,
+            "start_time": start_time.isoformat() if start_time else None,
+            "raison_fin": raison_fin
+        })
+        
+        if cas_id is None:
+            continue
+        
+        # Par niveau de difficulté
+        if niveau_difficulte:
+            group = groups.setdefault(niveau_difficulte, {"nb_sessions": 0, "scores": []})
+            group["nb_sessions"] += 1
+            if score_final is not None:
+                group["scores"].append(score_final)
+        
+        # Cas difficiles
+        if score_final is not None and score_final < 60.0:
+            weak_cases.append({
+                "session_id": str(session_id),
+                "cas_clinique_id": cas_id,
+                "code_fultang": code_fultang,
+                "niveau_difficulte": niveau_difficulte,
+                "score": score_final,
+                "pathologie_id": pathologie_id,
+                "date": start_time.isoformat() if start_time else None
+            })
+    
+    if sessions:
+        general_stats = {
+            "learner_id": learner_id,
+            "total_sessions": len(sessions),
+            "completed_sessions": len(sessions),
+            "average_score": round(compute_average_score(scores), 2),
+            "best_score": max(scores) if scores else 0.0,
+            "worst_score": min(scores) if scores else 0.0,
+            "progress": round(compute_progress(scores), 2),
+            "trend": compute_trend(scores),
+            "total_time_spent": sum(times) if times else 0,
+            "average_time_per_session": round(sum(times) / len(times), 2) if times else 0,
+            "sessions": sessions
+        }
+    else:
+        general_stats = _empty_performance_stats(learner_id)
+    
+    by_difficulty = _difficulty_stats(groups)
+    # Top 5 des cas difficiles sans trier toute la liste
+    top_weak_cases = heapq.nsmallest(5, weak_cases, key=lambda x: x["score"])
     
     return {
         "general": general_stats,
         "by_difficulty": by_difficulty,
-        "weak_cases": weak_cases[:5],  # Top 5 des cas difficiles
-        "recommendations": _generate_recommendations(general_stats, by_difficulty, weak_cases)
+        "weak_cases": top_weak_cases,
+        "recommendations": _generate_recommendations(general_stats, by_difficulty, len(weak_cases))
     }
 
 
+_RECO_LOW_SCORE = "Score moyen faible. Revoir les fondamentaux et commencer par des cas plus simples."
+_RECO_MEDIUM_SCORE = "Performances moyennes. Continuer à pratiquer sur des cas variés."
+_RECO_HIGH_SCORE = "Bonnes performances. Prêt pour des cas plus complexes."
+
+# Recommandation par tranche de 10 points du score moyen (indice = avg // 10) :
+# < 50 faible, < 70 moyen, sinon bon
+_RECO_BY_SCORE_BUCKET = (
+    (_RECO_LOW_SCORE,) * 5
+    + (_RECO_MEDIUM_SCORE,) * 2
+    + (_RECO_HIGH_SCORE,) * 4
+)
+
+_RECO_BY_TREND = {
+    "declining": "Tendance à la baisse détectée. Faire une pause ou revoir les concepts de base.",
+    "improving": "Progression positive ! Continuer sur cette lancée."
+}
+
+
 def _generate_recommendations(
     general_stats: Dict,
     by_difficulty: Dict,
-    weak_cases: List
+    nb_weak_cases: int
 ) -> List[str]:
     """
     Générer des recommandations basées sur les performances.
@@ -292,47 +580,38 @@ def _generate_recommendations(
     Args:
         general_stats: Statistiques générales
         by_difficulty: Performances par difficulté
-        weak_cases: Cas difficiles
+        nb_weak_cases: Nombre de cas difficiles
     
     Returns:
         Liste de recommandations
     """
-    recommendations = []
-    
     avg_score = general_stats.get("average_score", 0)
-    trend = general_stats.get("trend", "stable")
     
-    # Recommandations basées sur le score moyen
-    if avg_score < 50:
-        recommendations.append("Score moyen faible. Revoir les fondamentaux et commencer par des cas plus simples.")
-    elif avg_score < 70:
-        recommendations.append("Performances moyennes. Continuer à pratiquer sur des cas variés.")
-    else:
-        recommendations.append("Bonnes performances. Prêt pour des cas plus complexes.")
+    # Recommandation basée sur le score moyen (tranche bornée à [0, 10])
+    bucket = min(max(int(avg_score // 10), 0), len(_RECO_BY_SCORE_BUCKET) - 1)
+    recommendations = [_RECO_BY_SCORE_BUCKET[bucket]]
     
-    # Recommandations basées sur la tendance
-    if trend == "declining":
-        recommendations.append("Tendance à la baisse détectée. Faire une pause ou revoir les concepts de base.")
-    elif trend == "improving":
-        recommendations.append("Progression positive ! Continuer sur cette lancée.")
+    # Recommandation basée sur la tendance
+    trend_reco = _RECO_BY_TREND.get(general_stats.get("trend", "stable"))
+    if trend_reco:
+        recommendations.append(trend_reco)
     
     # Recommandations basées sur les niveaux de difficulté
-    if by_difficulty:
-        levels_with_issues = [
-            level for level, stats in by_difficulty.items()
-            if stats["average_score"] < 60
-        ]
-        if levels_with_issues:
-            recommendations.append(
-                f"Difficultés sur les niveaux {', '.join(map(str, levels_with_issues))}. "
-                "Concentrer les efforts sur ces niveaux."
-            )
+    levels_with_issues = ", ".join([
+        str(level) for level, stats in by_difficulty.items()
+        if stats["average_score"] < 60
+    ])
+    if levels_with_issues:
+        recommendations.append(
+            f"Difficultés sur les niveaux {levels_with_issues}. "
+            "Concentrer les efforts sur ces niveaux."
+        )
     
     # Recommandations basées sur les cas faibles
-    if len(weak_cases) > 5:
+    if nb_weak_cases > 5:
         recommendations.append(
-            f"Plusieurs cas difficiles identifiés ({len(weak_cases)}). "
+            f"Plusieurs cas difficiles identifiés ({nb_weak_cases}). "
             "Reprendre les cas échoués pour renforcer la maîtrise."
         )
     
-    return recommendations
\ No newline at end of file
+    return recommendations
@@ -1,12 +1,16 @@
 """Service pour les sessions de simulation."""
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
+from sqlalchemy import (
+    case, exists, select, update, cast, literal, tuple_, Integer
+)
+from sqlalchemy.engine import Row
 from typing import List, Optional
 from uuid import UUID
-from datetime import datetime
 from app.models.simulation_session import SimulationSession
 from app.models.learner import Learner
 from app.models.cas_clinique import CasCliniqueEnrichi
+from app.services.performance_service import invalidate_performance_summary
 
 
 def create_session(
@@ -25,14 +29,15 @@ def create_session(
     Returns:
         Session créée
     """
-    # Vérifier que l'apprenant existe
-    learner = db.query(Learner).filter(Learner.id == learner_id).first()
-    if not learner:
+    # Vérifier l'existence de l'apprenant et du cas (EXISTS sur la clé
+    # primaire, sans charger les lignes)
+    learner_exists, case_exists = db.query(
+        exists().where(Learner.id == learner_id),
+        exists().where(CasCliniqueEnrichi.id == cas_clinique_id)
+    ).one()
+    if not learner_exists:
         raise ValueError(f"Apprenant {learner_id} non trouvé")
-    
-    # Vérifier que le cas existe
-    case = db.query(CasCliniqueEnrichi).filter(CasCliniqueEnrichi.id == cas_clinique_id).first()
-    if not case:
+    if not case_exists:
         raise ValueError(f"Cas clinique {cas_clinique_id} non trouvé")
     
     # Créer la session
@@ -72,23 +77,44 @@ def get_sessions_by_learner(
     db: Session,
     learner_id: int,
     skip: int = 0,
-    limit: int = 50
-) -> List[SimulationSession]:
+    limit: int = 50,
+    before_id: Optional[UUID] = None
+) -> List[Row]:
     """
-    Récupérer les sessions d'un apprenant.
+    Récupérer les sessions d'un apprenant, les plus récentes en premier.
+    
+    Lecture seule : les colonnes de la table sont renvoyées sous forme de
+    lignes, sans instancier ni suivre d'objets ORM. Avec `before_id` (ID de
+    la dernière session de la page précédente), la pagination se fait par
+    curseur sur (start_time, id) ; `skip` est alors ignoré.
     
     Args:
         db: Session de base de données
         learner_id: ID de l'apprenant
-        skip: Nombre de résultats à sauter
+        skip: Nombre de résultats à sauter (pagination par offset)
         limit: Nombre maximum de résultats
+        before_id: Curseur de pagination (ID de session exclu)
     
     Returns:
-        Liste des sessions
+        Liste des sessions (lignes, attributs = colonnes)
     """
-    return db.query(SimulationSession).filter(
-        SimulationSession.learner_id == learner_id
-    ).order_by(SimulationSession.start_time.desc()).offset(skip).limit(limit).all()
+    table = SimulationSession.__table__
+    query = select(*table.c).where(table.c.learner_id == learner_id)
+    
+    if before_id is not None:
+        cursor_start = select(table.c.start_time).where(
+            table.c.id == before_id
+        ).scalar_subquery()
+        query = query.where(
+            tuple_(table.c.start_time, table.c.id)
+            < tuple_(cursor_start, literal(before_id, table.c.id.type))
+        )
+    else:
+        query = query.offset(skip)
+    
+    return db.execute(
+        query.order_by(table.c.start_time.desc(), table.c.id.desc()).limit(limit)
+    ).all()
 
 
 def update_session_stage(
@@ -137,25 +163,31 @@ def complete_session(
     Returns:
         Session terminée ou None
     """
-    session = get_session_by_id(db, session_id)
-    if not session:
+    # Une seule requête : durée calculée par la base (horloge et fuseau
+    # cohérents avec start_time), session renvoyée par RETURNING
+    now = func.now()
+    session = db.execute(
+        update(SimulationSession)
+        .where(SimulationSession.id == session_id)
+        .values(
+            end_time=now,
+            temps_total=func.coalesce(
+                cast(func.floor(func.extract("epoch", now - SimulationSession.start_time)), Integer),
+                0
+            ),
+            score_final=score_final,
+            statut="termine",
+            raison_fin=raison_fin
+        )
+        .returning(SimulationSession)
+        .execution_options(synchronize_session="fetch", populate_existing=True)
+    ).scalar_one_or_none()
+    
+    if session is None:
         return None
     
-    # Calculer le temps total
-    if session.start_time:
-        temps_total = int((datetime.now() - session.start_time.replace(tzinfo=None)).total_seconds())
-    else:
-        temps_total = 0
-    
-    # Mettre à jour la session
-    session.end_time = func.now()
-    session.temps_total = temps_total
-    session.score_final = score_final
-    session.statut = "termine"
-    session.raison_fin = raison_fin
-    
     db.commit()
-    db.refresh(session)
+    invalidate_performance_summary(session.learner_id)
     
     # Mettre à jour les statistiques du cas
     from app.services.cas_clinique_service import update_case_statistics
@@ -190,6 +222,7 @@ def abandon_session(
     
     db.commit()
     db.refresh(session)
+    invalidate_performance_summary(session.learner_id)
     return session
 
 
@@ -227,11 +260,22 @@ def get_session_statistics(
     Returns:
         Dictionnaire avec statistiques
     """
-    sessions = db.query(SimulationSession).filter(
+    # Tous les compteurs en une seule requête d'agrégation
+    is_completed = SimulationSession.statut == "termine"
+    (
+        total, nb_completed, nb_abandoned, avg_score, best_score, total_time
+    ) = db.query(
+        func.count(SimulationSession.id),
+        func.count(case((is_completed, 1))),
+        func.count(case((SimulationSession.statut == "abandonne", 1))),
+        func.avg(case((is_completed, SimulationSession.score_final))),
+        func.max(case((is_completed, SimulationSession.score_final))),
+        func.coalesce(func.sum(case((is_completed, SimulationSession.temps_total))), 0)
+    ).filter(
         SimulationSession.learner_id == learner_id
-    ).all()
+    ).one()
     
-    if not sessions:
+    if not total:
         return {
             "total_sessions": 0,
             "completed_sessions": 0,
@@ -239,14 +283,11 @@ def get_session_statistics(
             "total_time_spent": 0
         }
     
-    completed = [s for s in sessions if s.statut == "termine"]
-    scores = [s.score_final for s in completed if s.score_final is not None]
-    
     return {
-        "total_sessions": len(sessions),
-        "completed_sessions": len(completed),
-        "abandoned_sessions": len([s for s in sessions if s.statut == "abandonne"]),
-        "average_score": sum(scores) / len(scores) if scores else 0.0,
-        "best_score": max(scores) if scores else 0.0,
-        "total_time_spent": sum(s.temps_total or 0 for s in completed)
-    }
\ No newline at end of file
+        "total_sessions": total,
+        "completed_sessions": nb_completed,
+        "abandoned_sessions": nb_abandoned,
+        "average_score": avg_score if avg_score is not None else 0.0,
+        "best_score": best_score if best_score is not None else 0.0,
+        "total_time_spent": total_time
+    }
@@ -1,12 +1,15 @@
 """Fonctions utilitaires pour les métriques."""
-from typing import List
+from functools import lru_cache
+from math import fsum
+from typing import Sequence
 
 
-def calculate_average_score(scores: List[float]) -> float:
-    """Calculer la moyenne des scores."""
-    if not scores:
+def calculate_average_score(scores: Sequence[float]) -> float:
+    """Calculer la moyenne des scores (somme exacte par fsum)."""
+    n: int = len(scores)
+    if n == 0:
         return 0.0
-    return sum(scores) / len(scores)
+    return fsum(scores) / n
 
 
 def calculate_success_rate(attempts: int, successes: int) -> float:
@@ -16,16 +19,50 @@ def calculate_success_rate(attempts: int, successes: int) -> float:
     return (successes / attempts) * 100
 
 
+class Normalizer:
+    """Normalisation entre 0 et 1 pour un intervalle [min_val, max_val] fixe."""
+    __slots__ = ("min_val", "inv_range", "valid")
+    
+    min_val: float
+    inv_range: float
+    valid: bool
+    
+    def __init__(self, min_val: float = 0.0, max_val: float = 100.0) -> None:
+        value_range: float = max_val - min_val
+        self.min_val = min_val
+        self.valid = value_range != 0
+        self.inv_range = 1.0 / value_range if self.valid else 0.0
+    
+    def __call__(self, score: float) -> float:
+        """Normaliser un score (0.0 si l'intervalle est vide)."""
+        if not self.valid:
+            return 0.0
+        return (score - self.min_val) * self.inv_range
+
+
+_DEFAULT_NORMALIZER = Normalizer()
+
+
+@lru_cache(maxsize=4096)
 def normalize_score(score: float, min_val: float = 0.0, max_val: float = 100.0) -> float:
-    """Normaliser un score entre 0 et 1."""
+    """Normaliser un score entre 0 et 1 (mémorisé ; pour un tableau, utiliser un Normalizer)."""
+    if min_val == 0.0 and max_val == 100.0:
+        return _DEFAULT_NORMALIZER(score)
     if max_val == min_val:
         return 0.0
     return (score - min_val) / (max_val - min_val)
 
 
+@lru_cache(maxsize=4096)
 def calculate_engagement_level(interaction_count: int, time_spent: float) -> float:
     """Calculer le niveau d'engagement basé sur les interactions et le temps."""
     # Formule simple : engagement = (interactions * 0.6) + (time_spent * 0.4)
     # Normalisé entre 0 et 1
-    engagement = (interaction_count * 0.6) + (time_spent * 0.4)
+    engagement: float = (interaction_count * 0.6) + (time_spent * 0.4)
     return min(1.0, max(0.0, engagement))
+
+
+def lru_cache_clear() -> None:
+    """Vider les caches de normalize_score et calculate_engagement_level (tests)."""
+    normalize_score.cache_clear()
+    calculate_engagement_level.cache_clear()